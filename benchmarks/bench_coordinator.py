@@ -0,0 +1,311 @@
+"""
+Benchmark YnabDataCoordinator refreshes against synthetic budgets
+
+Each case runs in its own process so peak RSS is per case. A case does a
+full refresh (first load) followed by a delta refresh, both through the
+real streaming parser, fed from a local fake client instead of the YNAB
+API. Wall times exclude generating the synthetic payloads; peak traced
+memory and retained allocation blocks come from a second, traced pass.
+Home Assistant must be installed (e.g. in the devcontainer).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_coordinator --transactions 1000 10000 100000
+    python -m benchmarks.bench_coordinator --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_coordinator --baseline benchmarks/baseline.json
+
+With --baseline the run fails (exit code 1) when a metric is more than
+--tolerance worse than the stored value. With --http the coordinator
+uses the real client against benchmarks.fake_server instead, so the
+times include HTTP and generating the payloads:
+
+    python -m benchmarks.bench_coordinator --http --latency 0.05
+
+With --tracked-accounts N only the first N accounts are selected, and
+their transactions are fetched per account rather than for the budget.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator
+
+from benchmarks.fake_server import FakeYnabServer
+from benchmarks.synthetic_budget import SyntheticBudget
+
+API_KEY = "benchmark"
+COMPARED_METRICS = ["full_seconds", "delta_seconds", "peak_rss_kib", "full_peak_traced_kib", "delta_peak_traced_kib"]
+
+class ChunkReader:
+    """Async file-like object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self.bytes_read = 0
+        self.generate_seconds = 0.0
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            # ijson probes with read(0) to tell bytes from str
+            return b""
+        started = time.perf_counter()
+        chunk = next(self._chunks, b"")
+        self.generate_seconds += time.perf_counter() - started
+        self.bytes_read += len(chunk)
+        return chunk
+
+class FakeYnabClient:
+    """Stands in for YnabApiClient, answering from a SyntheticBudget."""
+
+    def __init__(self, budget: SyntheticBudget):
+        self.budget = budget
+        self.rate_limit = None
+        self.requests = 0
+        self.bytes_read = 0
+        self.generate_seconds = 0.0
+
+    def add_rate_limit_listener(self, _listener: Callable[[int, int], None]):
+        return lambda: None
+
+    def _chunks(self, path: str, params: dict) -> Iterator[bytes]:
+        knowledge = params.get("last_knowledge_of_server")
+        if path.endswith("/months/current"):
+            return self.budget.month_current_chunks()
+        if path.endswith("/months"):
+            return self.budget.months_chunks(knowledge)
+        if "/months/" in path:
+            return self.budget.month_chunks(path.rsplit("/", 1)[1])
+        if path.endswith("/accounts"):
+            return self.budget.accounts_chunks(knowledge)
+        if path.endswith("/categories"):
+            return self.budget.categories_chunks(knowledge)
+        if "/accounts/" in path and path.endswith("/transactions"):
+            account = self.budget.account_index(path.split("/")[-2])
+            return self.budget.account_transactions_chunks(account, knowledge, params.get("since_date"))
+        if path.endswith("/scheduled_transactions"):
+            return self.budget.scheduled_transactions_chunks(knowledge)
+        if path.endswith("/transactions"):
+            return self.budget.transactions_chunks(knowledge)
+        if path.endswith("/settings"):
+            return self.budget.settings_chunks()
+        return self.budget.budget_detail_chunks(knowledge)
+
+    async def stream(self, _method: str, path: str, handlers: dict, params: dict | None = None):
+        from custom_components.ynab.api.instrumentation import StreamStats
+        from custom_components.ynab.api.streaming import MeasuredReader, decode_items
+        from custom_components.ynab.const import DECODE_IN_MEMORY_LIMIT
+
+        self.requests += 1
+        stats = StreamStats()
+        reader = ChunkReader(self._chunks(path, params or {}))
+        started = time.perf_counter()
+        await decode_items(MeasuredReader(reader, stats), handlers, DECODE_IN_MEMORY_LIMIT)
+        stats.total_seconds = time.perf_counter() - started
+        self.bytes_read += reader.bytes_read
+        self.generate_seconds += reader.generate_seconds
+        return stats
+
+    async def request(self, _method: str, path: str, params: dict | None = None) -> dict:
+        self.requests += 1
+        return json.loads(b"".join(self._chunks(path, params or {})))["data"]
+
+    async def import_transactions(self, _budget_id: str) -> dict:
+        return {"transaction_ids": []}
+
+class ServedStats:
+    """The FakeYnabClient counters, read from a FakeYnabServer."""
+
+    generate_seconds = 0.0
+
+    def __init__(self, server: FakeYnabServer):
+        self.server = server
+
+    @property
+    def requests(self) -> int:
+        return self.server.requests
+
+    @property
+    def bytes_read(self) -> int:
+        return self.server.bytes_sent
+
+
+async def measure(coordinator, client: FakeYnabClient | ServedStats, trace: bool) -> dict:
+    """Refresh once, timing it without the time spent generating the payloads."""
+    if trace:
+        tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    generated = client.generate_seconds
+    started = time.perf_counter()
+    await coordinator.async_refresh()
+    elapsed = time.perf_counter() - started - (client.generate_seconds - generated)
+    result = {"seconds": round(elapsed, 4), "retained_blocks": sys.getallocatedblocks() - blocks}
+    if trace:
+        result["peak_traced_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    if not coordinator.last_update_success:
+        raise RuntimeError(f"Refresh failed: {coordinator.last_exception}")
+    return result
+
+
+async def run_case(args) -> dict:
+    import aiohttp
+    from homeassistant.core import HomeAssistant
+    from custom_components.ynab.api.client import YnabApiClient
+    from custom_components.ynab.api.data_coordinator import YnabDataCoordinator
+    from custom_components.ynab.const import DOMAIN_DATA
+
+    budget = SyntheticBudget(
+        transactions=args.transactions,
+        categories=args.categories,
+        accounts=args.accounts,
+        changes_per_knowledge=args.changes,
+    )
+    config = {
+        "api_key": API_KEY,
+        "budget": budget.budget_id,
+        "categories": [],
+        "categories_include_all": True,
+        "accounts": [],
+        "accounts_include_all": True,
+    }
+    if args.tracked_accounts:
+        config.update({
+            "accounts": [account["id"] for account in budget.accounts[:args.tracked_accounts]],
+            "accounts_include_all": False,
+            "account_transactions": True,
+        })
+
+    results = {}
+    session = aiohttp.ClientSession() if args.http else None
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        for trace in (False, True):
+            budget.server_knowledge = 1
+            if args.http:
+                # uncompressed, compressing would count the server's time against the client
+                server = await FakeYnabServer(
+                    [budget], tokens=(API_KEY,), latency=args.latency, compress=False
+                ).start()
+                client = ServedStats(server)
+                api_client = YnabApiClient(session, API_KEY, endpoint=server.url)
+            else:
+                server = None
+                client = api_client = FakeYnabClient(budget)
+            # a fresh hub per pass, picking up the client
+            hass.data[DOMAIN_DATA] = {"clients": {API_KEY: api_client}}
+            coordinator = YnabDataCoordinator(hass, config)
+
+            full = await measure(coordinator, client, trace)
+            full_bytes = client.bytes_read
+            budget.advance()
+            delta = await measure(coordinator, client, trace)
+
+            if trace:
+                results["full_peak_traced_kib"] = full["peak_traced_kib"]
+                results["delta_peak_traced_kib"] = delta["peak_traced_kib"]
+                results["full_retained_blocks"] = full["retained_blocks"]
+                results["delta_retained_blocks"] = delta["retained_blocks"]
+            else:
+                results["full_seconds"] = full["seconds"]
+                results["delta_seconds"] = delta["seconds"]
+                results["full_bytes"] = full_bytes
+                results["delta_bytes"] = client.bytes_read - full_bytes
+                results["requests_per_refresh"] = client.requests / 2
+                results["peak_rss_kib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+            if server is not None:
+                await server.stop()
+
+    if session is not None:
+        await session.close()
+    return results
+
+
+def case_key(transactions: int, categories: int, accounts: int, http: bool = False, tracked: int = 0) -> str:
+    return (
+        f"{transactions}tx-{categories}cat-{accounts}acc"
+        + (f"-{tracked}tracked" if tracked else "")
+        + ("-http" if http else "")
+    )
+
+
+def run_in_subprocess(transactions: int, args) -> dict:
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_coordinator", "--single",
+            "--transactions", str(transactions),
+            "--categories", str(args.categories),
+            "--accounts", str(args.accounts),
+            "--changes", str(args.changes),
+            "--latency", str(args.latency),
+            "--tracked-accounts", str(args.tracked_accounts),
+            *(["--http"] if args.http else []),
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for key, metrics in results.items():
+        if key not in baseline:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = baseline[key].get(metric), metrics.get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {old} -> {new} (+{(new / old - 1):.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transactions", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--changes", type=int, default=10, help="transactions changed between refreshes")
+    parser.add_argument(
+        "--tracked-accounts", type=int, default=0, help="fetch the transactions of this many accounts one by one"
+    )
+    parser.add_argument("--http", action="store_true", help="go through the real client and a local fake server")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake server adds to every response")
+    parser.add_argument("--baseline", help="compare against this baseline file")
+    parser.add_argument("--save-baseline", help="write the results to this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        args.transactions = args.transactions[0]
+        print(json.dumps(asyncio.run(run_case(args))))
+        return
+
+    results = {}
+    for transactions in args.transactions:
+        key = case_key(transactions, args.categories, args.accounts, args.http, args.tracked_accounts)
+        results[key] = run_in_subprocess(transactions, args)
+        print(key, json.dumps(results[key]))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
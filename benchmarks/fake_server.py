@@ -0,0 +1,312 @@
+"""
+A local stand-in for the YNAB API, serving synthetic budgets over HTTP
+
+Serves the endpoints the integration uses from SyntheticBudget fixtures,
+including `last_knowledge_of_server` deltas, so the real client, hub and
+coordinators can be load tested without spending the quota of a real
+token. Like YNAB it counts the requests of every token in a rolling
+window, reports them in the X-Rate-Limit header and answers 429 once the
+limit is reached. Responses are gzip or deflate compressed when the client
+accepts it. Latency, injected server errors and payload size (via the
+number of transactions and memo padding) are configurable.
+
+Run from the repository root:
+
+    python -m benchmarks.fake_server --budgets 3 --transactions 10000 --latency 0.2
+    python -m benchmarks.fake_server --rate-limit 20 --window 60 --advance-every 30
+
+and point a client at it with YnabApiClient(session, "fake", endpoint=URL).
+In tests, start it in process with `await FakeYnabServer(...).start()`.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Iterator
+
+from aiohttp import web
+
+from benchmarks.synthetic_budget import SyntheticBudget
+
+DEFAULT_TOKEN = "fake"
+
+def error_response(status: int, name: str, detail: str, headers: dict | None = None) -> web.Response:
+    """An error in the shape YNAB returns them."""
+    return web.json_response(
+        {"error": {"id": str(status), "name": name, "detail": detail}}, status=status, headers=headers
+    )
+
+class RateLimiter:
+    """Requests per token in a rolling window, as YNAB counts them."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._requests: dict[str, deque[float]] = {}
+
+    def used(self, token: str) -> int:
+        requests = self._requests.setdefault(token, deque())
+        expired = time.monotonic() - self.window
+        while requests and requests[0] <= expired:
+            requests.popleft()
+        return len(requests)
+
+    def acquire(self, token: str) -> bool:
+        """Count a request, False if the token is over its limit."""
+        if self.used(token) >= self.limit:
+            return False
+        self._requests[token].append(time.monotonic())
+        return True
+
+    def header(self, token: str) -> str:
+        return f"{self.used(token)}/{self.limit}"
+
+class FakeYnabServer:
+    """Serves a set of synthetic budgets like the YNAB API under /v1."""
+
+    def __init__(
+        self,
+        budgets: list[SyntheticBudget],
+        tokens: tuple[str, ...] = (DEFAULT_TOKEN,),
+        rate_limit: int = 200,
+        window: float = 3600,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        advance_every: float | None = None,
+        compress: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 1,
+    ):
+        self.budgets = {budget.budget_id: budget for budget in budgets}
+        self.tokens = set(tokens)
+        self.limiter = RateLimiter(rate_limit, window)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.advance_every = advance_every
+        self.compress = compress
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._runner: web.AppRunner | None = None
+        self._advance_task: asyncio.Task | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/v1/budgets", self._budgets)
+        app.router.add_get("/v1/budgets/{budget_id}", self._budget)
+        app.router.add_get("/v1/budgets/{budget_id}/settings", self._settings)
+        app.router.add_get("/v1/budgets/{budget_id}/months", self._months)
+        app.router.add_get("/v1/budgets/{budget_id}/months/{month}", self._month)
+        app.router.add_get("/v1/budgets/{budget_id}/accounts", self._accounts)
+        app.router.add_get("/v1/budgets/{budget_id}/accounts/{account_id}/transactions", self._account_transactions)
+        app.router.add_get("/v1/budgets/{budget_id}/categories", self._categories)
+        app.router.add_get("/v1/budgets/{budget_id}/transactions", self._transactions)
+        app.router.add_get("/v1/budgets/{budget_id}/scheduled_transactions", self._scheduled_transactions)
+        app.router.add_post("/v1/budgets/{budget_id}/transactions/import", self._import)
+        return app
+
+    async def start(self) -> "FakeYnabServer":
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        # the port the OS picked when asked for 0
+        self.port = self._runner.addresses[0][1]
+        if self.advance_every:
+            self._advance_task = asyncio.create_task(self._advance_periodically())
+        return self
+
+    async def stop(self):
+        if self._advance_task is not None:
+            self._advance_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def advance(self, steps: int = 1):
+        """Change some transactions of every budget."""
+        for budget in self.budgets.values():
+            budget.advance(steps)
+
+    async def _advance_periodically(self):
+        while True:
+            await asyncio.sleep(self.advance_every)
+            self.advance()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests += 1
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if token not in self.tokens:
+            return error_response(401, "unauthorized", "Unauthorized")
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        if not self.limiter.acquire(token):
+            self.throttled += 1
+            return error_response(
+                429, "too_many_requests", "Too many requests", {"X-Rate-Limit": self.limiter.header(token)}
+            )
+        headers = {"X-Rate-Limit": self.limiter.header(token)}
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            return error_response(503, "service_unavailable", "Service unavailable", headers)
+
+        request["headers"] = headers
+        return await handler(request)
+
+    def _budget_of(self, request: web.Request) -> SyntheticBudget:
+        budget = self.budgets.get(request.match_info["budget_id"])
+        if budget is None:
+            raise web.HTTPNotFound(
+                text=json.dumps({"error": {"id": "404.2", "name": "resource_not_found", "detail": "Resource not found"}}),
+                content_type="application/json",
+            )
+        return budget
+
+    async def _send(self, request: web.Request, chunks: Iterator[bytes]) -> web.StreamResponse:
+        response = web.StreamResponse(headers=request["headers"])
+        response.content_type = "application/json"
+        if self.compress:
+            # gzip or deflate, whichever the client accepts
+            response.enable_compression()
+        await response.prepare(request)
+        for chunk in chunks:
+            self.bytes_sent += len(chunk)
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    @staticmethod
+    def _knowledge(request: web.Request) -> int | None:
+        knowledge = request.query.get("last_knowledge_of_server")
+        return int(knowledge) if knowledge else None
+
+    async def _budgets(self, request: web.Request) -> web.StreamResponse:
+        include_accounts = request.query.get("include_accounts") == "true"
+        summaries = [budget.summary(include_accounts) for budget in self.budgets.values()]
+        return await self._send(request, iter([json.dumps({"data": {"budgets": summaries}}).encode()]))
+
+    async def _budget(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(request, self._budget_of(request).budget_detail_chunks(self._knowledge(request)))
+
+    async def _settings(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(request, self._budget_of(request).settings_chunks())
+
+    async def _months(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(request, self._budget_of(request).months_chunks(self._knowledge(request)))
+
+    async def _month(self, request: web.Request) -> web.StreamResponse:
+        budget = self._budget_of(request)
+        month = request.match_info["month"]
+        if month == "current":
+            return await self._send(request, budget.month_current_chunks())
+        return await self._send(request, budget.month_chunks(month))
+
+    async def _accounts(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(request, self._budget_of(request).accounts_chunks(self._knowledge(request)))
+
+    async def _account_transactions(self, request: web.Request) -> web.StreamResponse:
+        budget = self._budget_of(request)
+        account = budget.account_index(request.match_info["account_id"])
+        if account is None:
+            return error_response(404, "resource_not_found", "Resource not found")
+        return await self._send(
+            request,
+            budget.account_transactions_chunks(account, self._knowledge(request), request.query.get("since_date")),
+        )
+
+    async def _categories(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(request, self._budget_of(request).categories_chunks(self._knowledge(request)))
+
+    async def _transactions(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(request, self._budget_of(request).transactions_chunks(self._knowledge(request)))
+
+    async def _scheduled_transactions(self, request: web.Request) -> web.StreamResponse:
+        return await self._send(
+            request, self._budget_of(request).scheduled_transactions_chunks(self._knowledge(request))
+        )
+
+    async def _import(self, request: web.Request) -> web.Response:
+        self._budget_of(request)
+        return web.json_response({"data": {"transaction_ids": []}}, status=201, headers=request["headers"])
+
+
+async def serve(args):
+    budgets = [
+        SyntheticBudget(
+            transactions=args.transactions,
+            categories=args.categories,
+            accounts=args.accounts,
+            changes_per_knowledge=args.changes,
+            seed=seed,
+            memo_bytes=args.memo_bytes,
+        )
+        for seed in range(1, args.budgets + 1)
+    ]
+    server = await FakeYnabServer(
+        budgets,
+        tokens=tuple(args.token),
+        rate_limit=args.rate_limit,
+        window=args.window,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        advance_every=args.advance_every,
+        compress=not args.no_compress,
+        host=args.host,
+        port=args.port,
+    ).start()
+
+    print(f"Serving {len(budgets)} budgets at {server.url} for tokens {', '.join(server.tokens)}")
+    for budget in budgets:
+        print(f"  {budget.name}: {budget.budget_id}")
+
+    try:
+        while True:
+            await asyncio.sleep(60)
+            print(f"{server.requests} requests, {server.throttled} throttled, {server.bytes_sent} bytes sent")
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token", nargs="+", default=[DEFAULT_TOKEN], help="accepted API keys")
+    parser.add_argument("--budgets", type=int, default=1)
+    parser.add_argument("--transactions", type=int, default=1_000)
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--changes", type=int, default=10, help="transactions changed per knowledge step")
+    parser.add_argument("--memo-bytes", type=int, default=0, help="memo padding of every transaction")
+    parser.add_argument("--rate-limit", type=int, default=200, help="requests per token and window")
+    parser.add_argument("--window", type=float, default=3600, help="rate limit window in seconds")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many more seconds, at random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--advance-every", type=float, help="seconds between server knowledge steps")
+    parser.add_argument("--no-compress", action="store_true", help="send responses uncompressed")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Synthetic YNAB budgets for benchmarking and load testing
+
+The payloads have the same shape as the YNAB API responses the integration
+reads (budget detail, months, accounts, transactions of the budget or of
+one account, scheduled transactions, settings), and
+are produced as a stream of JSON chunks so even a budget with a million
+transactions never has to sit in memory as a whole.
+
+Everything is derived from a seed, so two runs with the same parameters
+produce the same budget. Every server knowledge step after the initial
+one changes `changes_per_knowledge` transactions.
+"""
+
+import json
+import random
+import uuid
+from datetime import date, timedelta
+from typing import Iterator
+
+CHUNK_TRANSACTIONS = 1000
+CLEARED_STATES = ["cleared", "uncleared", "reconciled"]
+FREQUENCIES = ["monthly", "weekly", "everyOtherWeek", "twiceAMonth", "yearly", "every3Months", "never"]
+CURRENCY_FORMAT = {"iso_code": "USD", "decimal_digits": 2, "currency_symbol": "$"}
+
+class SyntheticBudget:
+
+    def __init__(
+        self,
+        transactions: int = 1000,
+        categories: int = 100,
+        accounts: int = 10,
+        months: int = 36,
+        changes_per_knowledge: int = 10,
+        seed: int = 1,
+        memo_bytes: int = 0,
+        scheduled: int = 20,
+    ):
+        self.transaction_count = transactions
+        self.category_count = categories
+        self.account_count = accounts
+        self.month_count = months
+        self.scheduled_count = scheduled
+        self.changes_per_knowledge = changes_per_knowledge
+        self.seed = seed
+        # pads every transaction, to scale the payloads without more transactions
+        self.memo = "m" * memo_bytes or None
+        self.server_knowledge = 1
+        self._today = date.today()
+        self.budget_id = self._id("budget", 0)
+        self.name = f"Synthetic budget {seed}"
+
+        self.accounts = [self._account(index) for index in range(accounts)]
+        self.category_groups = [
+            {"id": self._id("group", index), "name": f"Group {index}", "hidden": False, "deleted": False}
+            for index in range(max(categories // 10, 1))
+        ]
+        self.categories = [self._category(index) for index in range(categories)]
+        self.scheduled_transactions = [self._scheduled_transaction(index) for index in range(scheduled)]
+
+    def _id(self, kind: str, index: int) -> str:
+        return str(uuid.uuid5(uuid.NAMESPACE_OID, f"{self.seed}-{kind}-{index}"))
+
+    def _transaction_id(self, index: int) -> str:
+        # uuid shaped but cheap, there can be a million of these
+        return f"{self.seed:08x}-0000-4000-8000-{index:012x}"
+
+    def _account(self, index: int) -> dict:
+        rng = random.Random(f"{self.seed}-account-{index}")
+        return {
+            "id": self._id("account", index),
+            "name": f"Account {index}",
+            "type": rng.choice(["checking", "savings", "creditCard", "cash"]),
+            "on_budget": rng.random() < 0.8,
+            "closed": False,
+            "note": None,
+            "balance": rng.randint(-500_000, 5_000_000) * 10,
+            "cleared_balance": 0,
+            "uncleared_balance": 0,
+            "transfer_payee_id": self._id("transfer-payee", index),
+            "direct_import_linked": False,
+            "direct_import_in_error": False,
+            "deleted": False,
+        }
+
+    def _category(self, index: int) -> dict:
+        rng = random.Random(f"{self.seed}-category-{index}")
+        group = self.category_groups[index % len(self.category_groups)]
+        budgeted = rng.randint(0, 100_000) * 10
+        activity = -rng.randint(0, 120_000) * 10
+        return {
+            "id": self._id("category", index),
+            "category_group_id": group["id"],
+            "category_group_name": group["name"],
+            "name": f"Category {index}",
+            "hidden": False,
+            "original_category_group_id": None,
+            "note": None,
+            "budgeted": budgeted,
+            "activity": activity,
+            "balance": budgeted + activity,
+            "goal_type": None,
+            "deleted": False,
+        }
+
+    def _month(self, offset: int) -> dict:
+        first = date.today().replace(day=1)
+        for _ in range(offset):
+            first = (first - timedelta(days=1)).replace(day=1)
+
+        categories = self.categories if offset == 0 else [
+            {**category, "activity": 0, "balance": category["budgeted"]} for category in self.categories
+        ]
+        return {
+            "month": first.isoformat(),
+            "note": None,
+            "income": 500_000_0,
+            "budgeted": sum(category["budgeted"] for category in categories),
+            "activity": sum(category["activity"] for category in categories),
+            "to_be_budgeted": 12_340,
+            "age_of_money": 42,
+            "deleted": False,
+            "categories": categories,
+        }
+
+    def _scheduled_transaction(self, index: int) -> dict:
+        rng = random.Random(f"{self.seed}-scheduled-{index}")
+        account = self.accounts[index % len(self.accounts)]
+        # every fifth one is a transfer to the next account
+        transfer = self.accounts[(index + 1) % len(self.accounts)] if index % 5 == 4 else None
+        first = self._today - timedelta(days=rng.randint(0, 400))
+        return {
+            "id": self._id("scheduled", index),
+            "date_first": first.isoformat(),
+            "date_next": (self._today + timedelta(days=rng.randint(0, 27))).isoformat(),
+            "frequency": FREQUENCIES[index % len(FREQUENCIES)],
+            "amount": rng.choice([-1, -1, -1, 1]) * rng.randint(1, 200_000) * 10,
+            "memo": None,
+            "flag_color": None,
+            "account_id": account["id"],
+            "account_name": account["name"],
+            "payee_id": self._id("payee", index % 500),
+            "payee_name": f"Payee {index % 500}",
+            "category_id": None if transfer else self.categories[index % len(self.categories)]["id"],
+            "category_name": None if transfer else self.categories[index % len(self.categories)]["name"],
+            "transfer_account_id": transfer["id"] if transfer else None,
+            "deleted": False,
+            "subtransactions": [],
+        }
+
+    def transaction(self, index: int, knowledge: int = 1) -> dict:
+        """Return transaction `index` as it looks at the given server knowledge."""
+        # a cheap integer mix instead of a seeded Random per transaction
+        mix = (index * 2654435761 + knowledge * 40503 + self.seed * 97) % 4294967311
+        account = self.accounts[index % len(self.accounts)]
+        category = self.categories[index % len(self.categories)]
+        return {
+            "id": self._transaction_id(index),
+            "date": (self._today - timedelta(days=(self.transaction_count - index) % 3650)).isoformat(),
+            "amount": -(mix % 50_000 + 1) * 10,
+            "memo": self.memo,
+            "cleared": CLEARED_STATES[(mix >> 8) % 20 // 7],
+            "approved": (mix >> 16) % 50 != 0,
+            "flag_color": None,
+            "account_id": account["id"],
+            "account_name": account["name"],
+            "payee_id": self._id("payee", index % 500),
+            "payee_name": f"Payee {index % 500}",
+            "category_id": category["id"],
+            "category_name": category["name"],
+            "transfer_account_id": None,
+            "transfer_transaction_id": None,
+            "matched_transaction_id": None,
+            "import_id": None,
+            "deleted": False,
+            "subtransactions": [],
+        }
+
+    def changed_indexes(self, knowledge: int) -> list[int]:
+        """Return the transactions changed when the server reached `knowledge`."""
+        rng = random.Random(f"{self.seed}-changes-{knowledge}")
+        count = min(self.changes_per_knowledge, self.transaction_count)
+        return rng.sample(range(self.transaction_count), count)
+
+    def advance(self, steps: int = 1):
+        """Move the server knowledge forward, changing some transactions."""
+        self.server_knowledge += steps
+
+    def _changed_since(self, last_knowledge: int) -> dict[int, int]:
+        latest = {}
+        for knowledge in range(last_knowledge + 1, self.server_knowledge + 1):
+            for index in self.changed_indexes(knowledge):
+                latest[index] = knowledge
+        return latest
+
+    def account_index(self, account_id: str) -> int | None:
+        for index, account in enumerate(self.accounts):
+            if account["id"] == account_id:
+                return index
+        return None
+
+    def transactions(
+        self, last_knowledge: int | None = None, account: int | None = None, since_date: str | None = None
+    ) -> Iterator[dict]:
+        """Yield the transactions, only those of account index `account` and dated `since_date` or later if given."""
+        if last_knowledge is None:
+            changed = self._changed_since(1)
+            if account is None:
+                indexes = range(self.transaction_count)
+            else:
+                indexes = range(account, self.transaction_count, len(self.accounts))
+            items = (self.transaction(index, changed.get(index, 1)) for index in indexes)
+        else:
+            items = (
+                self.transaction(index, knowledge)
+                for index, knowledge in sorted(self._changed_since(last_knowledge).items())
+                if account is None or index % len(self.accounts) == account
+            )
+        for item in items:
+            if since_date is None or item["date"] >= since_date:
+                yield item
+
+    # response bodies, as iterators of JSON chunks
+
+    def _array(self, items: Iterator[dict]) -> Iterator[bytes]:
+        yield b"["
+        batch = []
+        first = True
+        for item in items:
+            batch.append(json.dumps(item))
+            if len(batch) == CHUNK_TRANSACTIONS:
+                yield (b"" if first else b",") + ",".join(batch).encode()
+                first = False
+                batch = []
+        if batch:
+            yield (b"" if first else b",") + ",".join(batch).encode()
+        yield b"]"
+
+    def budget_detail_chunks(self, last_knowledge: int | None = None) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}"""
+        full = last_knowledge is None
+        budget = {
+            "id": self.budget_id,
+            "name": self.name,
+            "currency_format": CURRENCY_FORMAT,
+            "accounts": self.accounts if full else [],
+            "category_groups": self.category_groups if full else [],
+            "categories": self.categories if full else [],
+            "months": [self._month(offset) for offset in range(self.month_count)] if full else [],
+            "payees": [],
+            "scheduled_transactions": self.scheduled_transactions if full else [],
+        }
+        # leave the budget object open so the transactions can be streamed into it
+        yield json.dumps({"data": {"budget": budget}})[:-3].encode()
+        yield b',"transactions":'
+        yield from self._array(self.transactions(last_knowledge))
+        yield f'}},"server_knowledge":{self.server_knowledge}}}}}'.encode()
+
+    def summary(self, include_accounts: bool = True) -> dict:
+        """The budget as listed by GET /budgets."""
+        summary = {"id": self.budget_id, "name": self.name, "currency_format": CURRENCY_FORMAT}
+        if include_accounts:
+            summary["accounts"] = self.accounts
+        return summary
+
+    def budgets_chunks(self) -> Iterator[bytes]:
+        """GET /budgets"""
+        yield json.dumps({"data": {"budgets": [self.summary()]}}).encode()
+
+    def month_current_chunks(self) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/months/current"""
+        yield json.dumps({"data": {"month": self._month(0)}}).encode()
+
+    def month_chunks(self, month: str) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/months/{month}"""
+        first = date.fromisoformat(month)
+        offset = (self._today.year - first.year) * 12 + self._today.month - first.month
+        yield json.dumps({"data": {"month": self._month(offset)}}).encode()
+
+    def months_chunks(self, last_knowledge: int | None = None) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/months"""
+        months = [self._month(offset) for offset in range(self.month_count)] if last_knowledge is None else []
+        yield json.dumps({"data": {
+            "months": [{key: value for key, value in month.items() if key != "categories"} for month in months],
+            "server_knowledge": self.server_knowledge,
+        }}).encode()
+
+    def accounts_chunks(self, last_knowledge: int | None = None) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/accounts"""
+        accounts = self.accounts if last_knowledge is None else []
+        yield json.dumps({"data": {"accounts": accounts, "server_knowledge": self.server_knowledge}}).encode()
+
+    def categories_chunks(self, last_knowledge: int | None = None) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/categories"""
+        groups = [] if last_knowledge is not None else [
+            {**group, "categories": [c for c in self.categories if c["category_group_id"] == group["id"]]}
+            for group in self.category_groups
+        ]
+        yield json.dumps({"data": {"category_groups": groups, "server_knowledge": self.server_knowledge}}).encode()
+
+    def transactions_chunks(self, last_knowledge: int | None = None) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/transactions"""
+        yield b'{"data":{"transactions":'
+        yield from self._array(self.transactions(last_knowledge))
+        yield f',"server_knowledge":{self.server_knowledge}}}}}'.encode()
+
+    def account_transactions_chunks(
+        self, account: int, last_knowledge: int | None = None, since_date: str | None = None
+    ) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/accounts/{account_id}/transactions"""
+        yield b'{"data":{"transactions":'
+        yield from self._array(self.transactions(last_knowledge, account, since_date))
+        yield f',"server_knowledge":{self.server_knowledge}}}}}'.encode()
+
+    def scheduled_transactions_chunks(self, last_knowledge: int | None = None) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/scheduled_transactions"""
+        scheduled = self.scheduled_transactions if last_knowledge is None else []
+        yield json.dumps({"data": {
+            "scheduled_transactions": scheduled, "server_knowledge": self.server_knowledge,
+        }}).encode()
+
+    def settings_chunks(self) -> Iterator[bytes]:
+        """GET /budgets/{budget_id}/settings"""
+        yield json.dumps({"data": {"settings": {
+            "date_format": {"format": "DD/MM/YYYY"},
+            "currency_format": CURRENCY_FORMAT,
+        }}}).encode()
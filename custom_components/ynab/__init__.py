@@ -1,46 +1,45 @@
 """YNAB Integration."""
 
-import json
 import logging
 import os
-from datetime import date, timedelta
 
-import aiohttp
-import homeassistant.helpers.config_validation as cv
-import voluptuous as vol
-from homeassistant.const import CONF_API_KEY
-from homeassistant.helpers import discovery
-from homeassistant.util import Throttle
-from ynab_sdk import YNAB
-from ynab_sdk.api.models.responses.budget_detail import BudgetDetailResponse, Budget
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 
+from .api.data_coordinator import YnabDataCoordinator, storage_key, synced_storage_key
 from .const import (
     CONF_BUDGET_KEY,
     CONF_CATEGORIES_KEY,
     CONF_ACCOUNTS_KEY,
-    DEFAULT_API_ENDPOINT,
     DOMAIN,
+    DOMAIN_DATA,
     ISSUE_URL,
     REQUIRED_FILES,
     STARTUP,
+    STORAGE_VERSION,
     VERSION,
 )
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass, config):
+    """Set up the services shared by all entries."""
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass, entry):
     """Set up this integration using config flow."""
-    # startup message
-    startup = STARTUP.format(name=DOMAIN, version=VERSION, issueurl=ISSUE_URL)
-    _LOGGER.info(startup)
+    domain_data = hass.data.setdefault(DOMAIN_DATA, {})
 
-    # check all required files
-    file_check = await check_files(hass)
-    if not file_check:
-        return False
+    # the startup message and file check are the same for every entry
+    if "files_present" not in domain_data:
+        _LOGGER.info(STARTUP.format(name=DOMAIN, version=VERSION, issueurl=ISSUE_URL))
+        domain_data["files_present"] = await check_files(hass)
 
-    url_check = await check_url()
-    if not url_check:
+    if not domain_data["files_present"]:
         return False
 
     # get global config
@@ -52,20 +51,59 @@ async def async_setup_entry(hass, entry):
     if CONF_ACCOUNTS_KEY in entry.data:
         _LOGGER.debug("Monitoring accounts - %s", entry.data[CONF_ACCOUNTS_KEY])
 
+    coordinator = YnabDataCoordinator(hass, {**entry.data, **entry.options})
+    entry.async_on_unload(coordinator.hub.register(coordinator))
+
+    coordinators = domain_data.setdefault("coordinators", {})
+    coordinators[entry.entry_id] = coordinator
+
+    def forget_coordinator():
+        del coordinators[entry.entry_id]
+
+    entry.async_on_unload(forget_coordinator)
+
+    def start_background_work():
+        # an import brings a refresh of its own, so both wait for the first refresh
+        entry.async_on_unload(coordinator.importer.async_start())
+        entry.async_on_unload(coordinator.backfill.async_start())
+
+    async def catch_up():
+        await coordinator.async_refresh()
+        start_background_work()
+
+    if await coordinator.async_restore():
+        # create the entities from the saved data and catch up in the background
+        entry.async_create_background_task(hass, catch_up(), f"{DOMAIN} refresh {entry.entry_id}")
+    else:
+        # a failed first fetch retries the setup
+        await coordinator.async_config_entry_first_refresh()
+        start_background_work()
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     hass.async_create_task(
         hass.config_entries.async_forward_entry_setup(entry, "sensor")
     )
 
     return True
 
+async def async_reload_entry(hass, entry):
+    """Reload a config entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_unload_entry(hass, entry):
+    """Unload a config entry."""
+    return await hass.config_entries.async_forward_entry_unload(entry, "sensor")
+
+async def async_remove_entry(hass, entry):
+    """Delete the saved budget data of a removed entry."""
+    for key in (storage_key(entry.data[CONF_BUDGET_KEY]), synced_storage_key(entry.data[CONF_BUDGET_KEY])):
+        await Store(hass, STORAGE_VERSION, key).async_remove()
+
 async def check_files(hass):
     """Return bool that indicates if all files are present."""
     base = f"{hass.config.path()}/custom_components/{DOMAIN}/"
-    missing = []
-    for file in REQUIRED_FILES:
-        fullpath = f"{base}{file}"
-        if not os.path.exists(fullpath):
-            missing.append(file)
+    missing = await hass.async_add_executor_job(missing_files, base)
 
     if missing:
         _LOGGER.critical("The following files are missing: %s", str(missing))
@@ -75,26 +113,6 @@ async def check_files(hass):
 
     return returnvalue
 
-
-async def check_url():
-    """Return bool that indicates YNAB URL is accessible."""
-
-    url = DEFAULT_API_ENDPOINT
-
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    _LOGGER.debug("Connection with YNAB established")
-                    result = True
-                else:
-                    _LOGGER.debug(
-                        "Connection with YNAB established, "
-                        "but wasnt able to communicate with API endpoint"
-                    )
-                    result = False
-    except Exception as error:  # pylint: disable=broad-except
-        _LOGGER.debug("Unable to establish connection with YNAB - %s", error)
-        result = False
-
-    return result
+def missing_files(base: str) -> list[str]:
+    """Return the required files not found in base, blocking."""
+    return [file for file in REQUIRED_FILES if not os.path.exists(f"{base}{file}")]
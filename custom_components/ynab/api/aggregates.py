@@ -0,0 +1,84 @@
+import logging
+from dataclasses import dataclass, field
+
+_LOGGER = logging.getLogger(__name__)
+
+# (approved, cleared, account_id) as kept by the budget snapshot
+TransactionFlags = tuple[bool, str, str]
+
+def is_open(flags: TransactionFlags) -> bool:
+    """Return whether a transaction counts anywhere, i.e. needs approval or is uncleared."""
+    approved, cleared, _ = flags
+    return approved is not True or cleared == "uncleared"
+
+@dataclass
+class TransactionCounts:
+    need_approval: int = 0
+    uncleared: int = 0
+
+    def apply(self, flags: TransactionFlags, sign: int):
+        approved, cleared, _ = flags
+        if approved is not True:
+            self.need_approval += sign
+        if cleared == "uncleared":
+            self.uncleared += sign
+
+@dataclass
+class TransactionAggregates:
+    """Transaction counters kept up to date as transactions are merged.
+
+    Each change costs O(1), so a refresh costs O(changes) rather than a
+    rescan of the whole history. `verify` recounts from scratch to check
+    the incremental bookkeeping.
+    """
+
+    totals: TransactionCounts = field(default_factory=TransactionCounts)
+    accounts: dict[str, TransactionCounts] = field(default_factory=dict)
+
+    def update(self, old: TransactionFlags | None, new: TransactionFlags | None):
+        """Account for a transaction changing from old to new (None when absent)."""
+        if old is not None:
+            self._apply(old, -1)
+        if new is not None:
+            self._apply(new, 1)
+
+    def _apply(self, flags: TransactionFlags, sign: int):
+        self.totals.apply(flags, sign)
+
+        account_id = flags[2]
+        counts = self.accounts.get(account_id)
+        if counts is None:
+            counts = self.accounts[account_id] = TransactionCounts()
+        counts.apply(flags, sign)
+
+    def for_account(self, account_id: str) -> TransactionCounts:
+        return self.accounts.get(account_id) or TransactionCounts()
+
+    @classmethod
+    def count(cls, transactions: dict[str, TransactionFlags]) -> "TransactionAggregates":
+        """Count every transaction from scratch."""
+        aggregates = cls()
+        for flags in transactions.values():
+            aggregates._apply(flags, 1)
+        return aggregates
+
+    def verify(self, transactions: dict[str, TransactionFlags]) -> bool:
+        """Compare against a full recount, adopting the recount on mismatch."""
+
+        expected = self.count(transactions)
+        matches = expected.totals == self.totals and {
+            key: counts for key, counts in expected.accounts.items() if counts != TransactionCounts()
+        } == {
+            key: counts for key, counts in self.accounts.items() if counts != TransactionCounts()
+        }
+
+        if not matches:
+            _LOGGER.warning(
+                "Transaction counters drifted from a full recount (%s, expected %s), correcting",
+                self.totals,
+                expected.totals,
+            )
+            self.totals = expected.totals
+            self.accounts = expected.accounts
+
+        return matches
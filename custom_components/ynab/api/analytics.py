@@ -0,0 +1,110 @@
+import calendar
+import logging
+from datetime import date
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# planes of the history matrix
+FIELDS = ("budgeted", "activity", "balance")
+BUDGETED, ACTIVITY, BALANCE = range(len(FIELDS))
+
+# CategoryModel fields filled in from the trends, all in milliunits
+TREND_FIELDS = (
+    "average_budgeted",
+    "average_activity",
+    "average_balance",
+    "activity_change",
+    "projected_activity",
+)
+
+def months_before(month: str, count: int) -> str:
+    """Return the first of the month `count` months before `month`, both as YYYY-MM-DD."""
+    first = date.fromisoformat(month)
+    index = first.year * 12 + first.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1).isoformat()
+
+class MonthAnalytics:
+    """Per-category trends over the recent months of a budget, computed together in one NumPy matrix."""
+
+    def __init__(self, history_months: int, average_months: int):
+        self.history_months = history_months
+        self.average_months = average_months
+        self._months: list[str] = []
+        self._columns: dict[str, int] = {}
+        self._matrix: "np.ndarray | None" = None
+        self._trends: dict[str, dict[str, int | None]] = {}
+
+    def update(self, months: dict[str, dict], updated: set[str], current_month: str | None, today: date):
+        """Bring the matrix up to date with the snapshot months and recompute the trends."""
+
+        if current_month not in months:
+            self._trends = {}
+            return
+
+        window = sorted(month for month in months if month <= current_month)[-(self.history_months + 1):]
+        categories = months[current_month]["categories"]
+        # the months or categories moved, start over
+        restart = window != self._months or categories.keys() != self._columns.keys()
+        rows = window if restart else [month for month in window if month in updated]
+        if not rows:
+            return
+
+        # imported on first use, loading NumPy is slow
+        import numpy as np
+
+        if restart:
+            self._months = window
+            self._columns = {category_id: column for column, category_id in enumerate(categories)}
+            self._matrix = np.zeros((len(FIELDS), len(window), len(categories)), dtype=np.int64)
+
+        for month in rows:
+            row = self._months.index(month)
+            self._matrix[:, row, :] = 0
+            for category_id, category in months[month]["categories"].items():
+                column = self._columns.get(category_id)
+                if column is not None:
+                    self._matrix[:, row, column] = (category["budgeted"], category.get("activity", 0), category["balance"])
+
+        _LOGGER.debug("Recomputing trends of %s categories from months %s", len(self._columns), rows)
+        self._trends = self._compute(today)
+
+    def _compute(self, today: date) -> dict[str, dict[str, int | None]]:
+        import numpy as np
+
+        current = self._matrix[:, -1, :]
+        past = self._matrix[:, :-1, :][:, -self.average_months:, :]
+
+        if past.shape[1]:
+            averages = np.rint(past.mean(axis=1)).astype(np.int64).tolist()
+            change = (current[ACTIVITY] - past[ACTIVITY, -1]).tolist()
+        else:
+            # no complete month yet
+            averages = [[None] * len(self._columns)] * len(FIELDS)
+            change = [None] * len(self._columns)
+
+        # only the month in progress needs projecting
+        month = date.fromisoformat(self._months[-1])
+        if (month.year, month.month) == (today.year, today.month):
+            days = calendar.monthrange(today.year, today.month)[1]
+            projected = np.rint(current[ACTIVITY] * days / today.day).astype(np.int64).tolist()
+        else:
+            projected = current[ACTIVITY].tolist()
+
+        return {
+            category_id: dict(zip(TREND_FIELDS, (
+                averages[BUDGETED][column],
+                averages[ACTIVITY][column],
+                averages[BALANCE][column],
+                change[column],
+                projected[column],
+            )))
+            for category_id, column in self._columns.items()
+        }
+
+    def trends(self, category_id: str) -> dict[str, int | None]:
+        """Return the trend fields of a category, empty when it has none."""
+        return self._trends.get(category_id, {})
@@ -0,0 +1,282 @@
+import logging
+from datetime import date, timedelta
+from typing import Any, Callable, TypedDict
+
+from custom_components.ynab.api.aggregates import TransactionAggregates, TransactionFlags, is_open
+from custom_components.ynab.api.forecast import ScheduleForecast
+from custom_components.ynab.api.planner import Endpoint
+from custom_components.ynab.api.spending import SpendingIndex
+from custom_components.ynab.const import TRANSACTION_LOOKBACK_DAYS
+
+_LOGGER = logging.getLogger(__name__)
+
+# the records kept of the YNAB entities, amounts in milliunits
+class AccountRecord(TypedDict, total=False):
+    id: str
+    name: str
+    balance: int
+    on_budget: bool
+
+class CategoryRecord(TypedDict, total=False):
+    id: str
+    name: str
+    balance: int
+    budgeted: int
+    activity: int
+
+class MonthRecord(TypedDict, total=False):
+    month: str
+    to_be_budgeted: int
+    budgeted: int
+    activity: int
+    age_of_money: int | None
+    categories: dict[str, CategoryRecord]
+
+# the only fields the coordinator reads, everything else is dropped while parsing
+ACCOUNT_FIELDS = tuple(AccountRecord.__annotations__)
+MONTH_FIELDS = tuple(field for field in MonthRecord.__annotations__ if field != "categories")
+CATEGORY_FIELDS = tuple(CategoryRecord.__annotations__)
+
+def account_key(account_id: str) -> str:
+    """Return the knowledge key of the transactions of a tracked account."""
+    return f"{Endpoint.ACCOUNT_TRANSACTIONS}/{account_id}"
+
+class BudgetSnapshot:
+    """Local copy of a YNAB budget, keeping only what the sensors need, updated with delta requests."""
+
+    def __init__(
+        self, spending_windows: list[str] = (), forecast_days: int = 0, tracked_accounts: list[str] | None = None
+    ):
+        self.knowledge: dict[str, int] = {}
+        self._pending_knowledge: dict[str, int] = {}
+        self.currency_iso: str | None = None
+        self.current_month: str | None = None
+        self.accounts: dict[str, AccountRecord] = {}
+        self.months: dict[str, MonthRecord] = {}
+        self.stale_months: set[str] = set()
+        # months merged since the analytics last looked
+        self.updated_months: set[str] = set()
+        self.transactions: dict[str, TransactionFlags] = {}
+        self.aggregates = TransactionAggregates()
+        self.spending = SpendingIndex(list(spending_windows))
+        self.forecast = ScheduleForecast(forecast_days)
+        self.tracked_accounts = None if tracked_accounts is None else sorted(tracked_accounts)
+        self.open_dates: dict[str, str] = {}
+
+    def reset(self, endpoint: Endpoint):
+        """Forget what an endpoint returned so the next request is a full fetch."""
+        self.knowledge.pop(endpoint, None)
+        if endpoint == Endpoint.ACCOUNTS:
+            self.accounts = {}
+        elif endpoint == Endpoint.TRANSACTIONS:
+            self.transactions = {}
+            self.aggregates = TransactionAggregates()
+            self.spending.clear()
+            self.open_dates = {}
+        elif endpoint == Endpoint.SCHEDULED_TRANSACTIONS:
+            self.forecast.clear()
+
+    def reset_account(self, account_id: str):
+        """Forget the transactions of a tracked account so its next request is a full fetch."""
+        self.knowledge.pop(account_key(account_id), None)
+        for transaction_id in [
+            transaction_id for transaction_id, flags in self.transactions.items() if flags[2] == account_id
+        ]:
+            self.aggregates.update(self.transactions.pop(transaction_id), None)
+            self.open_dates.pop(transaction_id, None)
+        self.spending.remove_account(account_id)
+
+    def account_handlers(self, account_id: str) -> dict[str, Callable[[Any], None]]:
+        """Return the streaming handlers for the transactions of a tracked account."""
+
+        def set_pending_knowledge(server_knowledge: int):
+            self._pending_knowledge[account_key(account_id)] = server_knowledge
+
+        return {
+            "data.transactions.item": self.merge_account_transaction,
+            "data.server_knowledge": set_pending_knowledge,
+        }
+
+    def watermark(self, account_id: str, today: date) -> str:
+        """Return the day from which a tracked account's changes are needed.
+
+        That is its oldest open transaction, or the first day of the
+        spending windows or TRANSACTION_LOOKBACK_DAYS ago if that is older.
+        """
+
+        oldest = (today - timedelta(days=TRANSACTION_LOOKBACK_DAYS)).isoformat()
+        if self.spending.retain_from is not None and self.spending.retain_from < oldest:
+            oldest = self.spending.retain_from
+        for transaction_id, day in self.open_dates.items():
+            if day < oldest and self.transactions[transaction_id][2] == account_id:
+                oldest = day
+        return oldest
+
+    def handlers(self, endpoint: Endpoint) -> dict[str, Callable[[Any], None]]:
+        """Return the streaming handlers for an endpoint's response."""
+
+        def set_pending_knowledge(server_knowledge: int):
+            self._pending_knowledge[endpoint] = server_knowledge
+
+        return {
+            Endpoint.SETTINGS: {
+                "data.settings.currency_format.iso_code": self.set_currency,
+            },
+            Endpoint.MONTH_CURRENT: {
+                "data.month": self.replace_current_month,
+            },
+            Endpoint.MONTHS: {
+                "data.months.item": self.mark_month_changed,
+                "data.server_knowledge": set_pending_knowledge,
+            },
+            Endpoint.MONTH: {
+                "data.month": self.merge_month,
+            },
+            Endpoint.ACCOUNTS: {
+                "data.accounts.item": self.merge_account,
+                "data.server_knowledge": set_pending_knowledge,
+            },
+            Endpoint.TRANSACTIONS: {
+                "data.transactions.item": self.merge_transaction,
+                "data.server_knowledge": set_pending_knowledge,
+            },
+            Endpoint.SCHEDULED_TRANSACTIONS: {
+                "data.scheduled_transactions.item": self.forecast.update,
+                "data.server_knowledge": set_pending_knowledge,
+            },
+        }[endpoint]
+
+    def set_currency(self, iso_code: str):
+        self.currency_iso = iso_code
+
+    def commit(self, endpoint: Endpoint | str) -> bool:
+        """Adopt the server knowledge of the endpoint's merged response.
+
+        `endpoint` is the `account_key` for the transactions of an account.
+
+        Returns False when YNAB answered without knowledge or with older
+        knowledge than we had, in which case the endpoint's data can no
+        longer be trusted.
+        """
+
+        knowledge = self._pending_knowledge.pop(endpoint, None)
+        previous = self.knowledge.get(endpoint)
+        if knowledge is None:
+            return False
+        if previous is not None and knowledge < previous:
+            return False
+
+        _LOGGER.debug(
+            "Merged %s delta: server knowledge %s -> %s",
+            endpoint,
+            previous,
+            knowledge,
+        )
+        self.knowledge[endpoint] = knowledge
+        return True
+
+    def merge_account(self, account: dict):
+        if account.get("deleted"):
+            self.accounts.pop(account["id"], None)
+        else:
+            self.accounts[account["id"]] = pick(account, ACCOUNT_FIELDS)
+
+    def merge_transaction(self, transaction: dict) -> TransactionFlags | None:
+        """Merge a transaction, keeping its flags only while it is open."""
+        old = self.transactions.pop(transaction["id"], None)
+        new = None
+        if not transaction.get("deleted"):
+            flags = (transaction["approved"], transaction["cleared"], transaction["account_id"])
+            if is_open(flags):
+                new = self.transactions[transaction["id"]] = flags
+
+        self.aggregates.update(old, new)
+        self.spending.update(transaction["id"], None if transaction.get("deleted") else transaction)
+        return new
+
+    def merge_account_transaction(self, transaction: dict):
+        """Merge a transaction of a tracked account, also keeping the dates of the open ones."""
+        self.open_dates.pop(transaction["id"], None)
+        if self.merge_transaction(transaction) is not None:
+            self.open_dates[transaction["id"]] = transaction["date"]
+
+    def mark_month_changed(self, month: dict):
+        if month.get("deleted"):
+            self.months.pop(month["month"], None)
+            self.stale_months.discard(month["month"])
+        else:
+            self.stale_months.add(month["month"])
+
+    def replace_current_month(self, month: dict):
+        self.current_month = month["month"]
+        self.merge_month(month)
+
+    def merge_month(self, month: dict):
+        self.stale_months.discard(month["month"])
+        self.updated_months.add(month["month"])
+        self.months[month["month"]] = {
+            **pick(month, MONTH_FIELDS),
+            "categories": {
+                category["id"]: pick(category, CATEGORY_FIELDS)
+                for category in month.get("categories", [])
+                if not category.get("deleted")
+            },
+        }
+
+    def prune_months(self, oldest: str):
+        """Forget the months before `oldest`, they are no longer needed."""
+        for month in [month for month in self.months if month < oldest]:
+            del self.months[month]
+        self.stale_months = {month for month in self.stale_months if month >= oldest}
+
+    def as_dict(self) -> dict:
+        """Return the snapshot in a form that can be saved as JSON."""
+        return {
+            "knowledge": self.knowledge,
+            "currency_iso": self.currency_iso,
+            "current_month": self.current_month,
+            "accounts": self.accounts,
+            "months": self.months,
+            "stale_months": sorted(self.stale_months),
+            "transactions": self.transactions,
+            "spending": self.spending.as_dict(),
+            "forecast": self.forecast.as_dict(),
+            "tracked_accounts": self.tracked_accounts,
+            "open_dates": self.open_dates,
+        }
+
+    def restore(self, data: dict):
+        """Load a snapshot previously returned by `as_dict`."""
+        self.knowledge = data["knowledge"]
+        self.currency_iso = data["currency_iso"]
+        self.current_month = data["current_month"]
+        self.accounts = data["accounts"]
+        self.months = data["months"]
+        self.stale_months = set(data.get("stale_months", []))
+        self.updated_months = set(self.months)
+        # snapshots saved before only the open transactions were kept still have the others
+        self.transactions = {
+            transaction_id: tuple(flags) for transaction_id, flags in data["transactions"].items() if is_open(flags)
+        }
+        self.aggregates = TransactionAggregates.count(self.transactions)
+        self.open_dates = data.get("open_dates", {})
+        if "spending" not in data or not self.spending.restore(data["spending"]):
+            # the saved spending does not cover the windows, fetch all transactions again
+            self.knowledge.pop(Endpoint.TRANSACTIONS, None)
+            self._forget_account_knowledge()
+        if data.get("tracked_accounts") != self.tracked_accounts:
+            # the transactions were fetched for other accounts, fetch them again
+            self.reset(Endpoint.TRANSACTIONS)
+            self._forget_account_knowledge()
+        if "forecast" in data:
+            self.forecast.restore(data["forecast"])
+        else:
+            self.knowledge.pop(Endpoint.SCHEDULED_TRANSACTIONS, None)
+
+    def _forget_account_knowledge(self):
+        for key in [key for key in self.knowledge if key.startswith(f"{Endpoint.ACCOUNT_TRANSACTIONS}/")]:
+            del self.knowledge[key]
+
+
+def pick(entity: dict, fields: tuple[str, ...]) -> dict:
+    return {field: entity[field] for field in fields if field in entity}
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable
+
+import aiohttp
+import ijson
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.ynab.api.instrumentation import StreamStats
+from custom_components.ynab.api.streaming import MeasuredReader, decode_items, json_loads
+from custom_components.ynab.const import DECODE_IN_MEMORY_LIMIT, DEFAULT_API_ENDPOINT, DOMAIN_DATA, REQUEST_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+class YnabApiError(Exception):
+    """Raised when YNAB answers with an error or cannot be reached."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+class YnabAuthError(YnabApiError):
+    """Raised when YNAB rejects the API key."""
+
+class YnabApiClient:
+    """Async YNAB API client on top of a shared aiohttp session."""
+
+    def __init__(self, session: aiohttp.ClientSession, api_key: str, endpoint: str = DEFAULT_API_ENDPOINT):
+        self._session = session
+        self._endpoint = endpoint
+        self._headers = {
+            "accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Authorization": f"Bearer {api_key}",
+        }
+        self.rate_limit: str | None = None
+        self._rate_limit_listeners: list[Callable[[int, int], None]] = []
+
+    def add_rate_limit_listener(self, listener: Callable[[int, int], None]) -> Callable[[], None]:
+        """Call listener with (used, limit) whenever YNAB reports quota usage."""
+        self._rate_limit_listeners.append(listener)
+        return lambda: self._rate_limit_listeners.remove(listener)
+
+    def _record_rate_limit(self, header: str | None, throttled: bool):
+        if header is not None:
+            self.rate_limit = header
+            _LOGGER.debug("API Stats: %s", header)
+
+        try:
+            used, limit = (int(value) for value in self.rate_limit.split("/"))
+        except (AttributeError, ValueError):
+            return
+
+        if throttled:
+            used = limit
+
+        for listener in self._rate_limit_listeners:
+            listener(used, limit)
+
+    async def request(self, method: str, path: str, params: dict | None = None) -> dict:
+        """Send a request and return the `data` member of the response."""
+
+        try:
+            async with self._session.request(
+                method,
+                f"{self._endpoint}{path}",
+                params=params,
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                await self._raise_for_status(response)
+
+                # straight from the bytes, without decoding them to a str first
+                return json_loads(await response.read())["data"]
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as error:
+            raise YnabApiError(f"Error communicating with YNAB - {error}") from error
+
+    async def stream(
+        self, method: str, path: str, handlers: dict[str, Callable[[Any], None]], params: dict | None = None
+    ) -> StreamStats:
+        """Send a request and feed the response to handlers while it downloads.
+
+        See `dispatch_items` for the handler prefixes. Only responses up to
+        DECODE_IN_MEMORY_LIMIT bytes are held in memory as a whole.
+        """
+
+        stats = StreamStats()
+        started = time.perf_counter()
+        try:
+            async with self._session.request(
+                method,
+                f"{self._endpoint}{path}",
+                params=params,
+                headers=self._headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                await self._raise_for_status(response)
+                await decode_items(MeasuredReader(response.content, stats), handlers, DECODE_IN_MEMORY_LIMIT)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ijson.JSONError, ValueError) as error:
+            raise YnabApiError(f"Error communicating with YNAB - {error}") from error
+
+        stats.total_seconds = time.perf_counter() - started
+        return stats
+
+    async def _raise_for_status(self, response: aiohttp.ClientResponse):
+        self._record_rate_limit(response.headers.get("X-Rate-Limit"), response.status == 429)
+
+        if response.status in [200, 201]:
+            return
+
+        try:
+            payload = json_loads(await response.read())
+        except ValueError:
+            payload = None
+
+        if response.status == 401:
+            raise YnabAuthError(error_detail(payload), response.status)
+        raise YnabApiError(error_detail(payload), response.status)
+
+    async def get_budgets(self, include_accounts: bool = False) -> dict:
+        """Return the budget summaries, optionally with their accounts."""
+        params = {"include_accounts": "true"} if include_accounts else None
+        return await self.request("GET", "/budgets", params)
+
+    async def get_categories(self, budget_id: str) -> dict:
+        return await self.request("GET", f"/budgets/{budget_id}/categories")
+
+    async def import_transactions(self, budget_id: str) -> dict:
+        return await self.request("POST", f"/budgets/{budget_id}/transactions/import")
+
+
+def error_detail(payload) -> str:
+    if isinstance(payload, dict) and "error" in payload:
+        return payload["error"].get("detail") or payload["error"].get("name", "unknown error")
+    return "unknown error"
+
+
+def async_get_client(hass, api_key: str) -> YnabApiClient:
+    """Return the client for an API key, sharing Home Assistant's pooled session."""
+    clients = hass.data.setdefault(DOMAIN_DATA, {}).setdefault("clients", {})
+    if api_key not in clients:
+        clients[api_key] = YnabApiClient(async_get_clientsession(hass), api_key)
+
+    return clients[api_key]
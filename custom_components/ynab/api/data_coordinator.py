@@ -1,44 +1,145 @@
+import asyncio
 import logging
-import aiohttp
-import json
+import time
 
-from dataclasses import dataclass, field
-from datetime import date, timedelta
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Callable
 
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.const import CONF_API_KEY
-from ynab_sdk import YNAB
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from custom_components.ynab.api.analytics import MonthAnalytics, months_before
+from custom_components.ynab.api.budget_snapshot import BudgetSnapshot, account_key
+from custom_components.ynab.api.client import YnabApiError
+from custom_components.ynab.api.hub import async_get_hub
+from custom_components.ynab.api.importer import TransactionImporter
+from custom_components.ynab.api.instrumentation import RefreshInstrumentation, RefreshRecord
+from custom_components.ynab.api.metadata import async_get_metadata
+from custom_components.ynab.api.planner import DELTA_ENDPOINTS, ENDPOINT_PATHS, Endpoint, plan_endpoints
+from custom_components.ynab.api.resilience import CircuitBreaker
+from custom_components.ynab.api.scheduling import SingleFlight
+from custom_components.ynab.api.statistics import StatisticsBackfill
 
 from custom_components.ynab.const import (
+    CONF_ACCOUNT_TRANSACTIONS_KEY,
     CONF_CURRENCY_KEY,
     CONF_BUDGET_KEY,
+    CONF_BUDGET_NAME_KEY,
     CONF_CATEGORIES_KEY,
     CONF_CATEGORIES_ALL_KEY,
     CONF_ACCOUNTS_KEY,
     CONF_ACCOUNTS_ALL_KEY,
-    DEFAULT_API_ENDPOINT,
-    DOMAIN
+    CONF_IMPORT_INTERVAL_KEY,
+    CONF_SPENDING_WINDOWS_KEY,
+    CONF_FORECAST_DAYS_KEY,
+    DEFAULT_SPENDING_WINDOWS,
+    DEFAULT_FORECAST_DAYS,
+    SPENDING_TOP,
+    ANALYTICS_AVERAGE_MONTHS,
+    ANALYTICS_HISTORY_MONTHS,
+    BACKFILL_INTERVAL,
+    DEFAULT_IMPORT_INTERVAL,
+    DOMAIN,
+    REFRESH_COOLDOWN,
+    STALE_DATA_MAX_AGE,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-@dataclass
+# coordinator contexts of the entities, so a refresh only notifies the ones that changed
+ACCOUNT_CONTEXT = "account"
+CATEGORY_CONTEXT = "category"
+SPENDING_CONTEXT = "spending"
+BUDGET_CONTEXT = ("budget", None)
+FORECAST_CONTEXT = ("forecast", None)
+
+def from_milliunits(milliunits: int) -> Decimal:
+    """Return a YNAB milliunit amount in currency units, without float rounding."""
+    return Decimal(milliunits) / 1000
+
+@dataclass(slots=True)
 class AccountModel:
     name: str
-    balance: float
+    balance_milliunits: int
+    need_approval: int = 0
+    uncleared_transactions: int = 0
+
+    # projected from the scheduled transactions, None while the forecast is off
+    projected_balance_milliunits: int | None = None
+    lowest_projected_balance_milliunits: int | None = None
+    lowest_projected_balance_date: str | None = None
 
-@dataclass
+    @property
+    def balance(self) -> Decimal:
+        return from_milliunits(self.balance_milliunits)
+
+@dataclass(slots=True)
 class CategoryModel:
     name: str
-    balance: float
-    budgeted: float
-
-@dataclass
+    balance_milliunits: int
+    budgeted_milliunits: int
+
+    # trends over the previous months, None while there is not enough history
+    average_budgeted_milliunits: int | None = None
+    average_activity_milliunits: int | None = None
+    average_balance_milliunits: int | None = None
+    activity_change_milliunits: int | None = None
+    projected_activity_milliunits: int | None = None
+
+    @property
+    def balance(self) -> Decimal:
+        return from_milliunits(self.balance_milliunits)
+
+    @property
+    def budgeted(self) -> Decimal:
+        return from_milliunits(self.budgeted_milliunits)
+
+@dataclass(slots=True)
+class SpendingModel:
+    """Outflows of a spending window, the breakdowns by name."""
+    total_milliunits: int
+    by_payee: dict[str, int]
+    by_category: dict[str, int]
+    by_account: dict[str, int]
+
+    @property
+    def total(self) -> Decimal:
+        return from_milliunits(self.total_milliunits)
+
+@dataclass(slots=True)
+class ForecastModel:
+    """Total balance of the on-budget accounts projected from the scheduled transactions."""
+    horizon_days: int
+    projected_balance_milliunits: int
+    lowest_balance_milliunits: int
+    lowest_balance_date: str
+    scheduled_transactions: int
+
+    @property
+    def projected_balance(self) -> Decimal:
+        return from_milliunits(self.projected_balance_milliunits)
+
+    @property
+    def lowest_balance(self) -> Decimal:
+        return from_milliunits(self.lowest_balance_milliunits)
+
+@dataclass(slots=True)
 class DataCoordinatorModel:
-    to_be_budgeted: float
-    total_balance: float
-    budgeted_this_month: float
-    activity_this_month: float
+    """Budget values as integer milliunits, converted when a sensor reads them."""
+    to_be_budgeted_milliunits: int
+    total_balance_milliunits: int
+    budgeted_this_month_milliunits: int
+    activity_this_month_milliunits: int
 
     age_of_money: int
     need_approval: int
@@ -49,194 +150,699 @@ class DataCoordinatorModel:
 
     accounts: dict[str, AccountModel] = field(default_factory=dict)
     categories: dict[str, CategoryModel] = field(default_factory=dict)
+    spending: dict[str, SpendingModel] = field(default_factory=dict)
+    forecast: ForecastModel | None = None
+
+    @property
+    def to_be_budgeted(self) -> Decimal:
+        return from_milliunits(self.to_be_budgeted_milliunits)
+
+    @property
+    def total_balance(self) -> Decimal:
+        return from_milliunits(self.total_balance_milliunits)
+
+    @property
+    def budgeted_this_month(self) -> Decimal:
+        return from_milliunits(self.budgeted_this_month_milliunits)
+
+    @property
+    def activity_this_month(self) -> Decimal:
+        return from_milliunits(self.activity_this_month_milliunits)
+
+    def changed_contexts(self, previous: "DataCoordinatorModel") -> set[tuple[str, str | None]]:
+        """Return the listener contexts whose values differ from `previous`."""
+        changed = {
+            (ACCOUNT_CONTEXT, account_id)
+            for account_id, account in self.accounts.items()
+            if previous.accounts.get(account_id) != account
+        }
+        changed.update(
+            (CATEGORY_CONTEXT, category_id)
+            for category_id, category in self.categories.items()
+            if previous.categories.get(category_id) != category
+        )
+        changed.update(
+            (SPENDING_CONTEXT, window)
+            for window, spending in self.spending.items()
+            if previous.spending.get(window) != spending
+        )
+        if any(
+            getattr(self, name) != getattr(previous, name)
+            for name in BUDGET_FIELDS
+        ):
+            changed.add(BUDGET_CONTEXT)
+        if self.forecast != previous.forecast:
+            changed.add(FORECAST_CONTEXT)
+        return changed
+
+    def membership_changes(self, previous: "DataCoordinatorModel") -> tuple[set, set]:
+        """Return the account and category contexts added and removed since `previous`."""
+        added = {(ACCOUNT_CONTEXT, account_id) for account_id in self.accounts.keys() - previous.accounts.keys()}
+        added.update((CATEGORY_CONTEXT, category_id) for category_id in self.categories.keys() - previous.categories.keys())
+        removed = {(ACCOUNT_CONTEXT, account_id) for account_id in previous.accounts.keys() - self.accounts.keys()}
+        removed.update((CATEGORY_CONTEXT, category_id) for category_id in previous.categories.keys() - self.categories.keys())
+        return added, removed
+
+    def has_context(self, context: tuple[str, str | None]) -> bool:
+        kind, data_id = context
+        if kind == ACCOUNT_CONTEXT:
+            return data_id in self.accounts
+        if kind == CATEGORY_CONTEXT:
+            return data_id in self.categories
+        if kind == SPENDING_CONTEXT:
+            return data_id in self.spending
+        if (kind, data_id) == FORECAST_CONTEXT:
+            return self.forecast is not None
+        return True
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DataCoordinatorModel":
+        return cls(**{
+            **data,
+            "accounts": {key: AccountModel(**value) for key, value in data["accounts"].items()},
+            "categories": {key: CategoryModel(**value) for key, value in data["categories"].items()},
+            "spending": {key: SpendingModel(**value) for key, value in data.get("spending", {}).items()},
+            "forecast": ForecastModel(**data["forecast"]) if data.get("forecast") else None,
+        })
+
+BUDGET_FIELDS = [
+    name for name in DataCoordinatorModel.__dataclass_fields__ if name not in ("accounts", "categories", "spending", "forecast")
+]
+
+def knowledge_rejected(error: YnabApiError) -> bool:
+    """Return whether YNAB refused a delta request because of its server knowledge."""
+    return error.status is not None and 400 <= error.status < 500 and error.status not in (401, 403, 404, 429)
+
+def storage_key(budget_id: str) -> str:
+    return f"{DOMAIN}.{budget_id}"
+
+def synced_storage_key(budget_id: str) -> str:
+    return f"{DOMAIN}.{budget_id}.synced"
 
 class YnabDataCoordinator(DataUpdateCoordinator):
+    """Keep one budget up to date, joining the refresh in flight instead of starting another."""
 
     def __init__(self, hass, config):
-        super().__init__(hass, _LOGGER, name="YNAB", update_interval=timedelta(seconds=300))
-        self.ynab = YNAB(config[CONF_API_KEY])
+        # no timer of our own, the hub of the API key refreshes all its budgets together
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="YNAB",
+            update_interval=None,
+            request_refresh_debouncer=Debouncer(hass, _LOGGER, cooldown=REFRESH_COOLDOWN, immediate=True),
+        )
         self.api_key = config[CONF_API_KEY]
+        self.hub = async_get_hub(hass, self.api_key)
+        self.client = self.hub.client
         self.budget = config[CONF_BUDGET_KEY]
         self.categories = config[CONF_CATEGORIES_KEY]
         self.categories_all = config[CONF_CATEGORIES_ALL_KEY]
         self.accounts = config[CONF_ACCOUNTS_KEY]
         self.accounts_all = config[CONF_ACCOUNTS_ALL_KEY]
+        self.currency = config.get(CONF_CURRENCY_KEY)
+        self.spending_windows = config.get(CONF_SPENDING_WINDOWS_KEY, DEFAULT_SPENDING_WINDOWS)
+        self.forecast_days = config.get(CONF_FORECAST_DAYS_KEY, DEFAULT_FORECAST_DAYS)
+        # transactions fetched per selected account rather than for the whole budget
+        self.account_transactions = (
+            config.get(CONF_ACCOUNT_TRANSACTIONS_KEY, False) and not self.accounts_all and bool(self.accounts)
+        )
+        # tracked accounts deleted in YNAB, skipped until the options change and the entry reloads
+        self.missing_accounts: set[str] = set()
+        self.snapshot = self.new_snapshot()
+        self.store = Store(hass, STORAGE_VERSION, storage_key(self.budget))
+        # the snapshot is only saved when it changed, the time of the last sync after every one
+        self.synced_store = Store(hass, STORAGE_VERSION, synced_storage_key(self.budget))
+        self.instrumentation = RefreshInstrumentation()
+        self.analytics = MonthAnalytics(ANALYTICS_HISTORY_MONTHS, ANALYTICS_AVERAGE_MONTHS)
+        self._published: DataCoordinatorModel | None = None
+        self._published_available = True
+        self.breaker = CircuitBreaker(f"budget {self.budget}")
+        self.last_synced: datetime | None = None
+        # server knowledge of the saved snapshot, nothing new to save while it stands
+        self._saved_knowledge: dict[str, int] | None = None
+        self._unsub_retry: Callable[[], None] | None = None
+        self._refresh = SingleFlight(hass, self._async_refresh_once)
+        self._membership_listeners: list[Callable[[set, set], None]] = []
+        self.importer = TransactionImporter(
+            hass,
+            self.client,
+            self.budget,
+            timedelta(seconds=config.get(CONF_IMPORT_INTERVAL_KEY, DEFAULT_IMPORT_INTERVAL)),
+            self.async_request_refresh,
+            self.instrumentation,
+            self.breaker,
+        )
+        self.backfill = StatisticsBackfill(
+            hass,
+            self.client,
+            self.budget,
+            config.get(CONF_BUDGET_NAME_KEY, DOMAIN),
+            timedelta(seconds=BACKFILL_INTERVAL),
+            lambda: self.data,
+        )
+
+    def new_snapshot(self) -> BudgetSnapshot:
+        snapshot = BudgetSnapshot(
+            self.spending_windows, self.forecast_days, self.accounts if self.account_transactions else None
+        )
+        snapshot.currency_iso = self.currency
+        return snapshot
+
+    async def async_restore(self) -> bool:
+        """Load the data saved by a previous run, returns True if there was any."""
+
+        stored = await self.store.async_load()
+        if not stored:
+            return False
+
+        try:
+            self.snapshot.restore(stored["snapshot"])
+            try:
+                # rebuild so changes to the selected accounts and categories apply
+                data = self.build_model(self.snapshot)
+            except UpdateFailed:
+                data = DataCoordinatorModel.from_dict(stored["data"])
+        except (KeyError, TypeError, ValueError) as error:
+            _LOGGER.debug("Ignoring unreadable saved data for budget %s - %s", self.budget, error)
+            self.snapshot = self.new_snapshot()
+            return False
+
+        self._saved_knowledge = dict(self.snapshot.knowledge)
+        synced = await self.synced_store.async_load() or {}
+        last_synced = [
+            dt_util.parse_datetime(value)
+            for value in (stored.get("last_synced"), synced.get("last_synced"))
+            if value
+        ]
+        self.last_synced = max(last_synced, default=None)
+        _LOGGER.debug(
+            "Restored budget %s at server knowledge %s, synced %s",
+            self.budget,
+            self.snapshot.knowledge,
+            self.last_synced,
+        )
+        self.async_set_updated_data(data)
+        return True
+
+    def _data_to_store(self, data: DataCoordinatorModel) -> dict:
+        return {
+            "snapshot": self.snapshot.as_dict(),
+            "data": asdict(data),
+            "last_synced": self.last_synced.isoformat() if self.last_synced else None,
+        }
+
+    @property
+    def stale(self) -> bool:
+        """Return whether the data is left over from before refreshes started failing."""
+        return self.data is not None and not self.last_update_success
+
+    @property
+    def data_available(self) -> bool:
+        """Return whether the entities have data to show, stale data up to STALE_DATA_MAX_AGE."""
+        if self.data is None:
+            return False
+        if self.last_update_success:
+            return True
+        return self.last_synced is not None and dt_util.utcnow() - self.last_synced <= timedelta(
+            seconds=STALE_DATA_MAX_AGE
+        )
 
+    async def async_refresh(self) -> None:
+        """Refresh data, or wait for the refresh already in flight."""
+        await self._refresh.async_run()
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Do the first refresh of the entry as a shared refresh, retrying the setup when it fails."""
+        await self.async_refresh()
+        if not self.last_update_success:
+            raise ConfigEntryNotReady(str(self.last_exception)) from self.last_exception
+
+    @property
+    def joined_refreshes(self) -> int:
+        """Return how many refreshes joined one already in flight."""
+        return self._refresh.joined
+
+    async def _async_refresh_once(self):
+        """Refresh data, also notifying the listeners when a failure follows a failure."""
+        previous_success = self.last_update_success
+        await super().async_refresh()
+        if not previous_success and not self.last_update_success:
+            # Home Assistant only notifies on the first failure, but stale data keeps ageing
+            self.async_update_listeners()
+
+    async def async_shutdown(self) -> None:
+        self._cancel_retry()
+        await super().async_shutdown()
+
+    @callback
+    def _schedule_retry(self, delay: float):
+        self._cancel_retry()
+        self._unsub_retry = async_call_later(self.hass, delay, self._handle_retry)
+
+    @callback
+    def _cancel_retry(self):
+        if self._unsub_retry is not None:
+            self._unsub_retry()
+            self._unsub_retry = None
+
+    async def _handle_retry(self, _now):
+        self._unsub_retry = None
+        self.breaker.half_open()
+        await self.async_refresh()
 
     async def _async_update_data(self):
         """Update data."""
 
-        # setup YNAB API
-        await self.request_import()
+        if not self.breaker.allow():
+            # the retry is scheduled, keep serving the last good data until then
+            raise UpdateFailed(
+                f"Requests to YNAB paused after {self.breaker.failures} failures, "
+                f"next attempt in {self.breaker.retry_in():.0f} seconds"
+            )
 
-        raw_budget = await self.hass.async_add_executor_job(
-            self.ynab.budgets.get_budget, self.budget
+        record = self.instrumentation.start()
+        started = time.perf_counter()
+        try:
+            with self.instrumentation.phase(record, "fetch"):
+                await self.sync_budget(record)
+
+            with self.instrumentation.phase(record, "aggregation"):
+                data = self.build_model(self.snapshot)
+        except YnabApiError as error:
+            record.error = str(error)
+            if error.status == 429:
+                # the quota is per rolling hour and shared by the key's budgets, a quick retry only adds to it
+                self._schedule_retry(self.breaker.record_throttled(self.hub.interval()))
+            else:
+                self._schedule_retry(self.breaker.record_failure())
+            raise UpdateFailed(str(error)) from error
+        except UpdateFailed as error:
+            record.error = str(error)
+            self._schedule_retry(self.breaker.record_failure())
+            raise
+        finally:
+            record.duration = time.perf_counter() - started
+            record.rate_limit_used = self.hub.used
+            record.rate_limit_limit = self.hub.limit
+            self.hub.record_refresh()
+
+        record.success = True
+        self.breaker.record_success()
+        self._cancel_retry()
+        self.last_synced = dt_util.utcnow()
+        self.synced_store.async_delay_save(lambda: {"last_synced": self.last_synced.isoformat()}, STORAGE_SAVE_DELAY)
+        if self.snapshot.knowledge != self._saved_knowledge:
+            self._saved_knowledge = dict(self.snapshot.knowledge)
+            self.store.async_delay_save(lambda: self._data_to_store(data), STORAGE_SAVE_DELAY)
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners whose data changed, timing the entity fan-out."""
+        record = self.instrumentation.last
+        if record is None:
+            self._notify_changed()
+            return
+
+        with self.instrumentation.phase(record, "fan_out"):
+            self._notify_changed()
+
+    @callback
+    def async_add_membership_listener(self, listener: Callable[[set, set], None]) -> Callable[[], None]:
+        """Call `listener(added, removed)` with the contexts that appear or disappear on a refresh."""
+        self._membership_listeners.append(listener)
+        return lambda: self._membership_listeners.remove(listener)
+
+    @callback
+    def _notify_changed(self):
+        previous = self._published
+        data = self.data
+        self._published = data
+        if data is None:
+            super().async_update_listeners()
+            return
+
+        if previous is not None and data is not previous:
+            added, removed = data.membership_changes(previous)
+            if added or removed:
+                _LOGGER.debug("Budget %s added %s, removed %s", self.budget, added, removed)
+                for listener in list(self._membership_listeners):
+                    listener(added, removed)
+
+        available = self.data_available
+        if previous is None or available != self._published_available:
+            # first data, or availability changed, everything needs writing
+            changed = None
+        else:
+            changed = data.changed_contexts(previous)
+            _LOGGER.debug("Budget %s changed for %s", self.budget, changed)
+        self._published_available = available
+
+        for update_callback, context in list(self._listeners.values()):
+            # listeners without a context, such as diagnostics, always update
+            if context is None:
+                update_callback()
+            elif changed is None:
+                # entities of removed ids are on their way out
+                if data.has_context(context):
+                    update_callback()
+            elif context in changed:
+                update_callback()
+
+    async def sync_budget(self, record: RefreshRecord):
+        """Bring the local budget snapshot up to date with YNAB."""
+
+        if self.snapshot.currency_iso is None:
+            # right after a config or options flow the budget summaries are cached
+            budget = async_get_metadata(self.hass, self.api_key).cached_budget(self.budget)
+            if budget is not None:
+                self.snapshot.currency_iso = budget["currency_format"]["iso_code"]
+
+        endpoints = plan_endpoints(
+            categories=self.categories_all or bool(self.categories),
+            accounts=self.accounts_all or bool(self.accounts),
+            currency_known=self.snapshot.currency_iso is not None,
+            forecast=self.forecast_days > 0,
+            account_transactions=self.account_transactions,
+        )
+        _LOGGER.debug("Refreshing budget %s from %s", self.budget, ", ".join(endpoints))
+
+        # move the spending windows first, so older transactions are not kept
+        self.snapshot.spending.advance(dt_util.now().date())
+
+        results = await asyncio.gather(
+            *(
+                self.sync_endpoint(endpoint, record)
+                for endpoint in endpoints
+                if endpoint != Endpoint.ACCOUNT_TRANSACTIONS
+            ),
+            *(
+                self.sync_account_transactions(account_id, record)
+                for account_id in (self.accounts if Endpoint.ACCOUNT_TRANSACTIONS in endpoints else ())
+                if account_id not in self.missing_accounts
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        if Endpoint.MONTHS in endpoints:
+            await self.sync_month_history(record)
+
+    async def sync_month_history(self, record: RefreshRecord):
+        """Fetch the categories of the months that changed within the analytics history."""
+
+        current = self.snapshot.current_month
+        if current is None:
+            return
+
+        self.snapshot.prune_months(months_before(current, ANALYTICS_HISTORY_MONTHS))
+        # the current month came with this refresh, future months are not analysed
+        self.snapshot.stale_months = {month for month in self.snapshot.stale_months if month < current}
+        if not self.snapshot.stale_months:
+            return
+
+        _LOGGER.debug("Fetching changed months %s of budget %s", sorted(self.snapshot.stale_months), self.budget)
+        results = await asyncio.gather(
+            *(self.sync_month(month, record) for month in sorted(self.snapshot.stale_months)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def sync_month(self, month: str, record: RefreshRecord):
+        path = ENDPOINT_PATHS[Endpoint.MONTH].format(budget_id=self.budget, month=month)
+        stats = await self.client.stream("GET", path, self.snapshot.handlers(Endpoint.MONTH))
+        record.add_stream(Endpoint.MONTH, stats)
+
+    async def sync_endpoint(self, endpoint: Endpoint, record: RefreshRecord):
+        """Merge one endpoint into the snapshot, only its changes where supported."""
+
+        path = ENDPOINT_PATHS[endpoint].format(budget_id=self.budget)
+        if endpoint not in DELTA_ENDPOINTS:
+            stats = await self.client.stream("GET", path, self.snapshot.handlers(endpoint))
+            record.add_stream(endpoint, stats)
+            return
+
+        await self.sync_delta(
+            endpoint, path, endpoint, self.snapshot.handlers(endpoint), lambda: self.snapshot.reset(endpoint), record
         )
 
-        get_data = raw_budget.data.budget
-        _LOGGER.debug("Retrieving data from budget id: %s", get_data.id)
+    async def sync_account_transactions(self, account_id: str, record: RefreshRecord):
+        """Merge the transactions of a tracked account changed since its watermark.
+
+        The first request, without server knowledge, fetches all of them so
+        every open transaction is found, later ones only ask for changes
+        dated from the watermark on.
+        """
+
+        key = account_key(account_id)
+        params = {}
+        if key in self.snapshot.knowledge:
+            params["since_date"] = self.snapshot.watermark(account_id, dt_util.now().date())
+        else:
+            # start from nothing, whatever was kept for the account may be outdated
+            self.snapshot.reset_account(account_id)
+
+        path = ENDPOINT_PATHS[Endpoint.ACCOUNT_TRANSACTIONS].format(budget_id=self.budget, account_id=account_id)
+        try:
+            await self.sync_delta(
+                Endpoint.ACCOUNT_TRANSACTIONS,
+                path,
+                key,
+                self.snapshot.account_handlers(account_id),
+                lambda: self.snapshot.reset_account(account_id),
+                record,
+                params,
+            )
+        except YnabApiError as error:
+            if error.status != 404:
+                raise
+            # the account was deleted in YNAB, its sensor goes with the accounts endpoint
+            _LOGGER.warning(
+                "Account %s of budget %s no longer exists, no longer fetching its transactions", account_id, self.budget
+            )
+            self.missing_accounts.add(account_id)
+            self.snapshot.reset_account(account_id)
+
+    async def sync_delta(
+        self,
+        endpoint: Endpoint,
+        path: str,
+        key: str,
+        handlers: dict,
+        reset: Callable[[], None],
+        record: RefreshRecord,
+        params: dict | None = None,
+    ):
+        """Merge the changes of a delta endpoint since the server knowledge kept under `key`.
+
+        When YNAB rejects the knowledge, `reset` forgets what was merged
+        and everything is fetched again.
+        """
+
+        params = params or {}
+        knowledge = self.snapshot.knowledge.get(key)
+        if knowledge is not None:
+            try:
+                stats = await self.client.stream(
+                    "GET", path, handlers, {**params, "last_knowledge_of_server": knowledge}
+                )
+                record.add_stream(endpoint, stats)
+                if self.snapshot.commit(key):
+                    return
+            except YnabApiError as error:
+                # outages, throttling and missing resources are not about the knowledge
+                if not knowledge_rejected(error):
+                    raise
+
+            _LOGGER.debug(
+                "Server knowledge %s rejected for %s, refetching",
+                knowledge,
+                key,
+            )
+            reset()
+            params = {name: value for name, value in params.items() if name != "since_date"}
+
+        stats = await self.client.stream("GET", path, handlers, params or None)
+        record.add_stream(endpoint, stats)
+        if not self.snapshot.commit(key):
+            raise UpdateFailed(f"Budget {self.budget} {key} response did not include server knowledge")
+
+    def build_model(self, snapshot: BudgetSnapshot) -> DataCoordinatorModel:
+        """Build the sensor data from the merged budget snapshot."""
+
+        _LOGGER.debug("Retrieving data from budget id: %s", self.budget)
+
+        # get current month data
+        month = snapshot.months.get(snapshot.current_month)
+        if month is None:
+            raise UpdateFailed(f"Budget {self.budget} has no data for the current month")
 
         # get to be budgeted data
-        to_be_budgeted = (
-            get_data.months[0].to_be_budgeted / 1000
-        )
+        to_be_budgeted = month["to_be_budgeted"]
         _LOGGER.debug(
             "Received data for: to be budgeted: %s",
-            (get_data.months[0].to_be_budgeted / 1000),
+            from_milliunits(to_be_budgeted),
         )
 
+        # check the incrementally maintained counters while debugging
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            snapshot.aggregates.verify(snapshot.transactions)
+
         # get unapproved transactions
-        unapproved_transactions = len(
-            [
-                transaction.amount
-                for transaction in get_data.transactions
-                if transaction.approved is not True
-            ]
-        )
+        unapproved_transactions = snapshot.aggregates.totals.need_approval
         _LOGGER.debug(
             "Received data for: unapproved transactions: %s",
             unapproved_transactions,
         )
 
         # get number of uncleared transactions
-        uncleared_transactions = len(
-            [
-                transaction.amount
-                for transaction in get_data.transactions
-                if transaction.cleared == "uncleared"
-            ]
-        )
+        uncleared_transactions = snapshot.aggregates.totals.uncleared
         _LOGGER.debug(
             "Received data for: uncleared transactions: %s", uncleared_transactions
         )
 
-        currency_iso = get_data.currency_format.iso_code
+        currency_iso = snapshot.currency_iso
 
         total_balance = 0
         # get account data
-        for account in get_data.accounts:
-            if account.on_budget:
-                total_balance += account.balance
+        for account in snapshot.accounts.values():
+            if account["on_budget"]:
+                total_balance += account["balance"]
 
         # get to be budgeted data
         _LOGGER.debug(
             "Received data for: total balance: %s",
-            (total_balance / 1000),
+            from_milliunits(total_balance),
         )
 
+        # get balances projected from the scheduled transactions
+        forecast = None
+        projections = {}
+        if self.forecast_days > 0:
+            today = dt_util.now().date()
+            projections = snapshot.forecast.project(
+                {account["id"]: account["balance"] for account in snapshot.accounts.values()}, today
+            )
+            projected, lowest, lowest_date = snapshot.forecast.project_total(
+                {account["id"]: account["balance"] for account in snapshot.accounts.values() if account["on_budget"]},
+                today,
+            )
+            forecast = ForecastModel(
+                self.forecast_days, projected, lowest, lowest_date, len(snapshot.forecast.scheduled)
+            )
+            _LOGGER.debug(
+                "Received data for forecast: %s",
+                [from_milliunits(projected), from_milliunits(lowest), lowest_date],
+            )
+
         # get accounts
         accounts: dict[str, AccountModel] = {}
-        for account in get_data.accounts:
-            if not self.accounts_all and account.id not in self.accounts:
+        for account in snapshot.accounts.values():
+            if not self.accounts_all and account["id"] not in self.accounts:
                 continue
 
-            accounts.update([(account.id, AccountModel(account.name, account.balance / 1000))])
+            counts = snapshot.aggregates.for_account(account["id"])
+            accounts.update([(account["id"], AccountModel(
+                account["name"], account["balance"], counts.need_approval, counts.uncleared,
+                *projections.get(account["id"], ()),
+            ))])
             _LOGGER.debug(
                 "Received data for account: %s",
-                [account.name, account.balance / 1000],
+                [account["name"], from_milliunits(account["balance"])],
             )
 
-        # get current month data
-        for month in get_data.months:
-            if month.month != date.today().strftime("%Y-%m-01"):
-                continue
+        # budgeted
+        budgeted_this_month = month["budgeted"]
+        _LOGGER.debug(
+            "Received data for: budgeted this month: %s",
+            from_milliunits(budgeted_this_month),
+        )
 
-            # budgeted
-            budgeted_this_month = month.budgeted / 1000
-            _LOGGER.debug(
-                "Received data for: budgeted this month: %s",
-                budgeted_this_month,
-            )
+        # activity
+        activity_this_month = month["activity"]
+        _LOGGER.debug(
+            "Received data for: activity this month: %s",
+            from_milliunits(activity_this_month),
+        )
 
-            # activity
-            activity_this_month = month.activity / 1000
-            _LOGGER.debug(
-                "Received data for: activity this month: %s",
-                activity_this_month,
+        # get age of money
+        age_of_money = month["age_of_money"]
+        _LOGGER.debug(
+            "Received data for: age of money: %s",
+            age_of_money,
+        )
+
+        # get number of overspend categories
+        overspent_categories = len(
+            [
+                category["balance"]
+                for category in month["categories"].values()
+                if category["balance"] < 0
+            ]
+        )
+        _LOGGER.debug(
+            "Received data for: overspent categories: %s",
+            overspent_categories,
+        )
+
+        # get category trends, recomputed for the months merged since the last build
+        if self.categories_all or self.categories:
+            self.analytics.update(
+                snapshot.months, snapshot.updated_months, snapshot.current_month, dt_util.now().date()
             )
+        snapshot.updated_months.clear()
+
+        # get remaining category balances
+        categories: dict[str, CategoryModel] = {}
+        for category in month["categories"].values():
+            if not self.categories_all and category["id"] not in self.categories:
+                continue
 
-            # get age of money
-            age_of_money = month.age_of_money
+            categories.update(
+                [(category["id"], CategoryModel(
+                    category["name"],
+                    category["balance"],
+                    category["budgeted"],
+                    **{f"{name}_milliunits": value for name, value in self.analytics.trends(category["id"]).items()},
+                ))]
+            )
             _LOGGER.debug(
-                "Received data for: age of money: %s",
-                age_of_money,
+                "Received data for categories: %s",
+                [category["name"], from_milliunits(category["balance"]), from_milliunits(category["budgeted"])],
             )
 
-            # get number of overspend categories
-            overspent_categories = len(
-                [
-                    category.balance
-                    for category in month.categories
-                    if category.balance < 0
-                ]
+        # get spending per window, kept up to date as transactions are merged
+        snapshot.spending.advance(dt_util.now().date())
+        spending: dict[str, SpendingModel] = {}
+        for window in snapshot.spending.windows:
+            total, breakdown = snapshot.spending.summary(window, SPENDING_TOP)
+            spending[window.name] = SpendingModel(
+                total, breakdown["payee"], breakdown["category"], breakdown["account"]
             )
             _LOGGER.debug(
-                "Received data for: overspent categories: %s",
-                overspent_categories,
+                "Received data for spending: %s",
+                [window.name, from_milliunits(total)],
             )
 
-            # get remaining category balances
-            categories: dict[str, CategoryModel] = {}
-            for category in month.categories:
-                if not self.categories_all and category.id not in self.categories:
-                    continue
-
-                categories.update(
-                    [(category.id, CategoryModel(category.name, category.balance / 1000, category.budgeted / 1000))]
-                )
-                _LOGGER.debug(
-                    "Received data for categories: %s",
-                    [category.name, category.balance / 1000, category.budgeted / 1000],
-                )
-
-            return DataCoordinatorModel(
-                to_be_budgeted=to_be_budgeted,
-                total_balance=total_balance / 1000,
-                budgeted_this_month=budgeted_this_month,
-                activity_this_month=activity_this_month,
+        return DataCoordinatorModel(
+            to_be_budgeted_milliunits=to_be_budgeted,
+            total_balance_milliunits=total_balance,
+            budgeted_this_month_milliunits=budgeted_this_month,
+            activity_this_month_milliunits=activity_this_month,
 
-                age_of_money=age_of_money,
-                need_approval=unapproved_transactions,
-                uncleared_transactions=uncleared_transactions,
-                overspent_categories=overspent_categories,
+            age_of_money=age_of_money,
+            need_approval=unapproved_transactions,
+            uncleared_transactions=uncleared_transactions,
+            overspent_categories=overspent_categories,
 
-                currency_iso=currency_iso,
+            currency_iso=currency_iso,
 
-                accounts=accounts,
-                categories=categories,
-            )
-
-    async def request_import(self):
-        """Force transaction import."""
-
-        import_endpoint = (
-            f"{DEFAULT_API_ENDPOINT}/budgets/{self.budget}/transactions/import"
+            accounts=accounts,
+            categories=categories,
+            spending=spending,
+            forecast=forecast,
         )
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-        }
-
-        try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.post(url=import_endpoint) as response:
-                    if response.status in [200, 201]:
-                        response_data = json.loads(await response.text())
-
-                        _LOGGER.debug(
-                            "Imported transactions: %s",
-                            len(response_data["data"]["transaction_ids"]),
-                        )
-                        _LOGGER.debug("API Stats: %s", response.headers["X-Rate-Limit"])
-
-                        if len(response_data["data"]["transaction_ids"]) > 0:
-                            _event_topic = DOMAIN + "_event"
-                            _event_data = {
-                                "transactions_imported": len(
-                                    response_data["data"]["transaction_ids"]
-                                )
-                            }
-                            self.hass.bus.async_fire(_event_topic, _event_data)
-
-        except Exception as error:  # pylint: disable=broad-except
-            _LOGGER.debug("Error encounted during forced import - %s", error)
\ No newline at end of file
@@ -0,0 +1,199 @@
+import calendar
+import logging
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_LOGGER = logging.getLogger(__name__)
+
+# days between the occurrences of the fixed length frequencies
+DAY_STEPS = {"daily": 1, "weekly": 7, "everyOtherWeek": 14, "every4Weeks": 28}
+# months between the occurrences of the calendar frequencies
+MONTH_STEPS = {
+    "monthly": 1,
+    "everyOtherMonth": 2,
+    "every3Months": 3,
+    "every4Months": 4,
+    "twiceAYear": 6,
+    "yearly": 12,
+    "everyOtherYear": 24,
+}
+
+# (date_first, date_next, frequency, ((account id, milliunits), ...))
+ScheduledRecord = tuple[str, str, str, tuple[tuple[str, int], ...]]
+# (balance at the end of the horizon, lowest balance, first day of the lowest balance), in milliunits
+Projection = tuple[int, int, str]
+
+def scheduled_effects(scheduled: dict) -> tuple[tuple[str, int], ...]:
+    """Return what one occurrence of a scheduled transaction does to each account balance.
+
+    Transfers, also those of split subtransactions, move the amount into
+    the other account as well.
+    """
+
+    effects = {scheduled["account_id"]: scheduled["amount"]}
+    if scheduled.get("transfer_account_id"):
+        transfers = [scheduled]
+    else:
+        transfers = [
+            part for part in scheduled.get("subtransactions") or []
+            if part.get("transfer_account_id") and not part.get("deleted")
+        ]
+    for part in transfers:
+        effects[part["transfer_account_id"]] = effects.get(part["transfer_account_id"], 0) - part["amount"]
+    return tuple(effects.items())
+
+def add_months(day: date, months: int, day_of_month: int) -> date:
+    """Return `day` moved by `months`, on `day_of_month` or the last day of shorter months."""
+    index = day.year * 12 + day.month - 1 + months
+    year, month = index // 12, index % 12 + 1
+    return date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+def occurrences(date_first: str, date_next: str, frequency: str, until: date) -> Iterator[date]:
+    """Yield the days a scheduled transaction occurs on, from its next occurrence up to `until`."""
+
+    first = date.fromisoformat(date_first)
+    day = date.fromisoformat(date_next)
+
+    if frequency in DAY_STEPS:
+        step = timedelta(days=DAY_STEPS[frequency])
+        while day <= until:
+            yield day
+            day += step
+    elif frequency in MONTH_STEPS:
+        # counted from the next occurrence, back on the 31st after February when the first one was
+        day_of_month = day.day
+        if day.day < first.day and day.day == calendar.monthrange(day.year, day.month)[1]:
+            day_of_month = first.day
+        count = 0
+        occurrence = day
+        while occurrence <= until:
+            yield occurrence
+            count += 1
+            occurrence = add_months(day, count * MONTH_STEPS[frequency], day_of_month)
+    elif frequency == "twiceAMonth":
+        # the day of month of the first occurrence and half a month from it
+        days = sorted({first.day, first.day + 15 if first.day <= 15 else first.day - 15})
+        month = day.replace(day=1)
+        while month <= until:
+            for day_of_month in days:
+                occurrence = add_months(month, 0, day_of_month)
+                if day <= occurrence <= until:
+                    yield occurrence
+            month = add_months(month, 1, 1)
+    elif day <= until:
+        # "never" repeats, unknown frequencies are taken for it too
+        yield day
+
+class ScheduleForecast:
+    """Account balances projected from the scheduled transactions of a budget."""
+
+    def __init__(self, horizon_days: int):
+        self.horizon_days = horizon_days
+        self.scheduled: dict[str, ScheduledRecord] = {}
+        self._expanded_on: date | None = None
+        self._rows: dict[str, int] = {}
+        self._running: "np.ndarray | None" = None
+
+    def clear(self):
+        """Forget all scheduled transactions, for a full refetch."""
+        self.scheduled = {}
+        self._expanded_on = None
+
+    def update(self, scheduled: dict):
+        """Merge a scheduled transaction from a (delta) response."""
+
+        if scheduled.get("deleted"):
+            if self.scheduled.pop(scheduled["id"], None) is not None:
+                self._expanded_on = None
+            return
+
+        record = (scheduled["date_first"], scheduled["date_next"], scheduled["frequency"], scheduled_effects(scheduled))
+        if self.scheduled.get(scheduled["id"]) != record:
+            self.scheduled[scheduled["id"]] = record
+            self._expanded_on = None
+
+    def expand(self, today: date):
+        """Bring the running sums up to date, unless they already are for `today`."""
+
+        if self._expanded_on == today:
+            return
+        # imported on first use, loading NumPy is slow
+        import numpy as np
+
+        days = self.horizon_days + 1
+        until = today + timedelta(days=self.horizon_days)
+        rows = {
+            account_id: row
+            for row, account_id in enumerate(
+                dict.fromkeys(account_id for *_, effects in self.scheduled.values() for account_id, _ in effects)
+            )
+        }
+        changes = np.zeros((len(rows), days), dtype=np.int64)
+        count = 0
+        for date_first, date_next, frequency, effects in self.scheduled.values():
+            columns = np.fromiter(
+                ((day - today).days for day in occurrences(date_first, date_next, frequency, until)), dtype=np.int64
+            )
+            if not columns.size:
+                continue
+            # occurrences per day, the overdue ones counted today
+            per_day = np.bincount(np.maximum(columns, 0), minlength=days)
+            for account_id, amount in effects:
+                changes[rows[account_id]] += per_day * amount
+            count += columns.size
+
+        self._rows = rows
+        self._running = np.cumsum(changes, axis=1)
+        self._expanded_on = today
+        _LOGGER.debug(
+            "Expanded %s scheduled transactions into %s occurrences over %s days",
+            len(self.scheduled),
+            count,
+            self.horizon_days,
+        )
+
+    def project(self, balances: dict[str, int], today: date) -> dict[str, Projection]:
+        """Return the projection of every account from its current balance."""
+
+        self.expand(today)
+        projections = {}
+        for account_id, balance in balances.items():
+            row = self._rows.get(account_id)
+            if row is None:
+                projections[account_id] = (balance, balance, today.isoformat())
+            else:
+                projections[account_id] = self._projection(balance, self._running[row], today)
+        return projections
+
+    def project_total(self, balances: dict[str, int], today: date) -> Projection:
+        """Return the projection of the sum of the accounts in `balances`."""
+
+        import numpy as np
+
+        self.expand(today)
+        rows = [self._rows[account_id] for account_id in balances if account_id in self._rows]
+        running = self._running[rows].sum(axis=0) if rows else np.zeros(self.horizon_days + 1, dtype=np.int64)
+        return self._projection(sum(balances.values()), running, today)
+
+    @staticmethod
+    def _projection(balance: int, running: "np.ndarray", today: date) -> Projection:
+        lowest = int(running.argmin())
+        return (
+            balance + int(running[-1]),
+            balance + int(running[lowest]),
+            (today + timedelta(days=lowest)).isoformat(),
+        )
+
+    def as_dict(self) -> dict:
+        return {"scheduled": self.scheduled}
+
+    def restore(self, data: dict):
+        """Load what `as_dict` returned."""
+        self.scheduled = {
+            scheduled_id: (date_first, date_next, frequency, tuple(tuple(effect) for effect in effects))
+            for scheduled_id, (date_first, date_next, frequency, effects) in data["scheduled"].items()
+        }
+        self._expanded_on = None
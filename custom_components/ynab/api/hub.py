@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Callable
+
+from homeassistant.core import callback
+
+from custom_components.ynab.api.client import async_get_client
+from custom_components.ynab.api.scheduling import RepeatingTimer
+from custom_components.ynab.const import (
+    DEFAULT_RATE_LIMIT,
+    DOMAIN_DATA,
+    MAX_REFRESH_INTERVAL,
+    MIN_REFRESH_INTERVAL,
+    RATE_LIMIT_RESERVE,
+    RATE_LIMIT_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+class YnabHub:
+    """Refresh every budget of an API key together, spacing the refreshes to fit its hourly quota."""
+
+    def __init__(self, hass, api_key: str):
+        self.hass = hass
+        self.client = async_get_client(hass, api_key)
+        self.used: int = 0
+        self.limit: int = DEFAULT_RATE_LIMIT
+        self.coordinators: list = []
+        self._requests = 0
+        self._refreshes = 0
+        self._timer = RepeatingTimer(hass, self.async_refresh, self._next_delay)
+
+        self.client.add_rate_limit_listener(self.record_rate_limit)
+
+    def register(self, coordinator) -> Callable[[], None]:
+        """Add a budget coordinator to the cycle and return a callback that removes it."""
+        self.coordinators.append(coordinator)
+        if len(self.coordinators) == 1:
+            self._timer.async_start(self._next_delay())
+
+        @callback
+        def unregister():
+            self.coordinators.remove(coordinator)
+            if not self.coordinators:
+                self._timer.async_stop()
+
+        return unregister
+
+    def record_rate_limit(self, used: int, limit: int):
+        self.used = used
+        self.limit = limit
+        self._requests += 1
+
+    def record_refresh(self):
+        self._refreshes += 1
+
+    @property
+    def requests_per_refresh(self) -> float:
+        """Return the average requests of refreshing one budget."""
+        if self._refreshes == 0:
+            return 2
+        return max(self._requests / self._refreshes, 1)
+
+    def interval(self) -> float:
+        """Return the seconds between refresh cycles."""
+
+        available = self.limit * (1 - RATE_LIMIT_RESERVE) - self.used
+        if available <= 0:
+            return MAX_REFRESH_INTERVAL
+
+        # assume the remaining quota has to last a whole window
+        wanted = len(self.coordinators) * self.requests_per_refresh * RATE_LIMIT_WINDOW / available
+        return min(max(wanted, MIN_REFRESH_INTERVAL), MAX_REFRESH_INTERVAL)
+
+    async def async_refresh(self):
+        """Refresh every registered budget concurrently."""
+        _LOGGER.debug("Refreshing %s budgets", len(self.coordinators))
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in list(self.coordinators)))
+
+    def _next_delay(self) -> float:
+        interval = self.interval()
+        _LOGGER.debug(
+            "API quota %s/%s used, next refresh in %.0f seconds",
+            self.used,
+            self.limit,
+            interval,
+        )
+        return interval
+
+
+def async_get_hub(hass, api_key: str) -> YnabHub:
+    """Return the hub shared by every entry using the API key."""
+    hubs = hass.data.setdefault(DOMAIN_DATA, {}).setdefault("hubs", {})
+    if api_key not in hubs:
+        hubs[api_key] = YnabHub(hass, api_key)
+
+    return hubs[api_key]
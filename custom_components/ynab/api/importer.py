@@ -0,0 +1,90 @@
+import logging
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from homeassistant.core import callback
+
+from custom_components.ynab.api.client import YnabApiClient, YnabApiError
+from custom_components.ynab.api.instrumentation import RefreshInstrumentation
+from custom_components.ynab.api.resilience import CircuitBreaker, jittered
+from custom_components.ynab.api.scheduling import RepeatingTimer, SingleFlight
+from custom_components.ynab.const import DOMAIN, MAX_IMPORT_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+class TransactionImporter:
+    """Ask YNAB to import linked-account transactions, backing off while there is nothing new."""
+
+    def __init__(
+        self,
+        hass,
+        client: YnabApiClient,
+        budget_id: str,
+        interval: timedelta,
+        on_imported: Callable[[], Awaitable[None]],
+        instrumentation: RefreshInstrumentation,
+        breaker: CircuitBreaker,
+    ):
+        self.hass = hass
+        self.client = client
+        self.budget_id = budget_id
+        self.interval = interval
+        self.delay = interval
+        self._on_imported = on_imported
+        self.instrumentation = instrumentation
+        self.breaker = breaker
+        self._import = SingleFlight(hass, self._async_import)
+        self._timer = RepeatingTimer(hass, self._handle_timer, self._next_delay)
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start importing right away and return a callback that stops importing."""
+        return self._timer.async_start(0)
+
+    def _next_delay(self) -> float:
+        delay = self.delay.total_seconds()
+        if self.delay > self.interval:
+            delay = jittered(delay)
+        return delay
+
+    async def _handle_timer(self):
+        if self.breaker.allow():
+            await self.async_import()
+        else:
+            _LOGGER.debug("Skipping forced import of budget %s, YNAB requests are paused", self.budget_id)
+            self._back_off()
+
+    async def async_import(self) -> int:
+        """Force a transaction import, returns the number of imported transactions."""
+        return await self._import.async_run()
+
+    async def _async_import(self) -> int:
+        started = time.perf_counter()
+        try:
+            response_data = await self.client.import_transactions(self.budget_id)
+        except YnabApiError as error:
+            _LOGGER.debug("Error encounted during forced import - %s", error)
+            self.instrumentation.record_import(time.perf_counter() - started, 0, str(error))
+            self._back_off()
+            return 0
+
+        imported = len(response_data["transaction_ids"])
+        self.instrumentation.record_import(time.perf_counter() - started, imported)
+        _LOGGER.debug("Imported transactions: %s", imported)
+
+        if imported == 0:
+            self._back_off()
+            return 0
+
+        self.delay = self.interval
+        _event_topic = DOMAIN + "_event"
+        _event_data = {"transactions_imported": imported}
+        self.hass.bus.async_fire(_event_topic, _event_data)
+
+        await self._on_imported()
+        return imported
+
+    def _back_off(self):
+        self.delay = min(self.delay * 2, timedelta(seconds=MAX_IMPORT_INTERVAL))
+        _LOGGER.debug("Next forced import in %s", self.delay)
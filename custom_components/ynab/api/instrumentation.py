@@ -0,0 +1,86 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+HISTORY_SIZE = 50
+
+@dataclass
+class StreamStats:
+    """What one streamed response cost: bytes, time waiting for them and total time."""
+    bytes: int = 0
+    read_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @property
+    def parse_seconds(self) -> float:
+        return max(self.total_seconds - self.read_seconds, 0.0)
+
+@dataclass
+class RefreshRecord:
+    started: datetime
+    success: bool = False
+    error: str | None = None
+    duration: float = 0.0
+    # import, fetch, parse, aggregation and fan_out, in seconds
+    phases: dict[str, float] = field(default_factory=dict)
+    response_bytes: int = 0
+    endpoints: list[str] = field(default_factory=list)
+    rate_limit_used: int | None = None
+    rate_limit_limit: int | None = None
+
+    def add_stream(self, endpoint: str, stats: StreamStats):
+        self.endpoints.append(endpoint)
+        self.response_bytes += stats.bytes
+        self.phases["parse"] = self.phases.get("parse", 0.0) + stats.parse_seconds
+
+class RefreshInstrumentation:
+    """Timings and outcomes of the last HISTORY_SIZE refreshes of a coordinator."""
+
+    def __init__(self):
+        self.history: deque[RefreshRecord] = deque(maxlen=HISTORY_SIZE)
+        self.last_import: dict | None = None
+
+    @property
+    def last(self) -> RefreshRecord | None:
+        return self.history[-1] if self.history else None
+
+    def start(self) -> RefreshRecord:
+        record = RefreshRecord(started=dt_util.utcnow())
+        self.history.append(record)
+        return record
+
+    @contextmanager
+    def phase(self, record: RefreshRecord, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            record.phases[name] = record.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def record_import(self, seconds: float, imported: int, error: str | None = None):
+        self.last_import = {
+            "finished": dt_util.utcnow().isoformat(),
+            "seconds": round(seconds, 3),
+            "imported": imported,
+            "error": error,
+        }
+
+    def as_dict(self) -> dict:
+        history = [
+            {
+                **asdict(record),
+                "started": record.started.isoformat(),
+                "phases": {name: round(seconds, 4) for name, seconds in record.phases.items()},
+            }
+            for record in self.history
+        ]
+        return {
+            "refreshes": len(history),
+            "failures": sum(1 for record in self.history if not record.success),
+            "last_import": self.last_import,
+            "history": history,
+        }
@@ -0,0 +1,80 @@
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from custom_components.ynab.api.client import YnabApiClient, YnabApiError, async_get_client
+from custom_components.ynab.const import DOMAIN_DATA, METADATA_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+BUDGETS_KEY = "budgets"
+
+class YnabMetadata:
+    """Budget summaries, accounts and categories of an API key, cached for a short time.
+
+    The config and options flows ask for the same lists in several steps,
+    and a new entry's first refresh needs its budget's currency right after
+    the flow. Everything comes from the light summary endpoints: the budget
+    list including accounts, and the categories of one budget.
+    """
+
+    def __init__(self, client: YnabApiClient, ttl: float = METADATA_TTL):
+        self._client = client
+        self._ttl = ttl
+        self._cache: dict[str, tuple[float, Any]] = {}
+
+    def peek(self, key: str) -> Any | None:
+        """Return a cached value that has not expired, without requesting it."""
+        cached = self._cache.get(key)
+        if cached is None or cached[0] < time.monotonic():
+            return None
+        return cached[1]
+
+    async def _get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.peek(key)
+        if value is None:
+            _LOGGER.debug("Fetching %s metadata", key)
+            value = await fetch()
+            self._cache[key] = (time.monotonic() + self._ttl, value)
+        return value
+
+    def invalidate(self):
+        self._cache.clear()
+
+    async def async_get_budgets(self) -> list[dict]:
+        """Return the budget summaries, each with its accounts."""
+
+        async def fetch():
+            return (await self._client.get_budgets(include_accounts=True))["budgets"]
+
+        return await self._get(BUDGETS_KEY, fetch)
+
+    def cached_budget(self, budget_id: str) -> dict | None:
+        """Return a budget summary if the budgets are cached."""
+        return next((budget for budget in self.peek(BUDGETS_KEY) or [] if budget["id"] == budget_id), None)
+
+    async def async_get_budget(self, budget_id: str) -> dict:
+        for budget in await self.async_get_budgets():
+            if budget["id"] == budget_id:
+                return budget
+        raise YnabApiError(f"Budget {budget_id} not found", 404)
+
+    async def async_get_accounts(self, budget_id: str) -> list[dict]:
+        budget = await self.async_get_budget(budget_id)
+        return [account for account in budget.get("accounts", []) if not account["deleted"]]
+
+    async def async_get_category_groups(self, budget_id: str) -> list[dict]:
+
+        async def fetch():
+            return (await self._client.get_categories(budget_id))["category_groups"]
+
+        return await self._get(f"categories/{budget_id}", fetch)
+
+
+def async_get_metadata(hass, api_key: str) -> YnabMetadata:
+    """Return the metadata cache of an API key."""
+    caches = hass.data.setdefault(DOMAIN_DATA, {}).setdefault("metadata", {})
+    if api_key not in caches:
+        caches[api_key] = YnabMetadata(async_get_client(hass, api_key))
+
+    return caches[api_key]
@@ -0,0 +1,82 @@
+from enum import StrEnum
+
+class Endpoint(StrEnum):
+    """YNAB endpoints the coordinator knows how to merge into a snapshot."""
+
+    SETTINGS = "settings"
+    MONTH_CURRENT = "month_current"
+    MONTHS = "months"
+    MONTH = "month"
+    ACCOUNTS = "accounts"
+    TRANSACTIONS = "transactions"
+    SCHEDULED_TRANSACTIONS = "scheduled_transactions"
+    # the transactions of one account, in place of TRANSACTIONS when only some accounts are tracked
+    ACCOUNT_TRANSACTIONS = "account_transactions"
+
+ENDPOINT_PATHS = {
+    Endpoint.SETTINGS: "/budgets/{budget_id}/settings",
+    Endpoint.MONTH_CURRENT: "/budgets/{budget_id}/months/current",
+    # month summaries, telling which months changed
+    Endpoint.MONTHS: "/budgets/{budget_id}/months",
+    # one month with its categories, requested for the changed months only
+    Endpoint.MONTH: "/budgets/{budget_id}/months/{month}",
+    Endpoint.ACCOUNTS: "/budgets/{budget_id}/accounts",
+    Endpoint.TRANSACTIONS: "/budgets/{budget_id}/transactions",
+    Endpoint.SCHEDULED_TRANSACTIONS: "/budgets/{budget_id}/scheduled_transactions",
+    Endpoint.ACCOUNT_TRANSACTIONS: "/budgets/{budget_id}/accounts/{account_id}/transactions",
+}
+
+# endpoints accepting last_knowledge_of_server, i.e. returning only changes
+DELTA_ENDPOINTS = {Endpoint.ACCOUNTS, Endpoint.MONTHS, Endpoint.TRANSACTIONS, Endpoint.SCHEDULED_TRANSACTIONS}
+
+# what each kind of sensor reads from the coordinator data
+BUDGET_SENSOR_ENDPOINTS = {
+    # to be budgeted, budgeted/activity this month, age of money, overspent categories
+    Endpoint.MONTH_CURRENT,
+    # total balance
+    Endpoint.ACCOUNTS,
+    # need approval, uncleared transactions
+    Endpoint.TRANSACTIONS,
+}
+CATEGORY_SENSOR_ENDPOINTS = {
+    # balance, budgeted
+    Endpoint.MONTH_CURRENT,
+    # trends over the previous months
+    Endpoint.MONTHS,
+}
+ACCOUNT_SENSOR_ENDPOINTS = {Endpoint.ACCOUNTS, Endpoint.TRANSACTIONS}
+# projected balances, from the current ones
+FORECAST_SENSOR_ENDPOINTS = {Endpoint.ACCOUNTS, Endpoint.SCHEDULED_TRANSACTIONS}
+
+def plan_endpoints(
+    categories: bool,
+    accounts: bool,
+    currency_known: bool,
+    forecast: bool = False,
+    account_transactions: bool = False,
+) -> list[Endpoint]:
+    """Return the smallest set of endpoints that covers the entry's sensors.
+
+    `categories`, `accounts` and `forecast` tell whether the entry has any
+    category, account or forecast sensors. Results are merged into the
+    budget snapshot, so the delta endpoints cost little after the first
+    refresh, and the budget settings are only requested while the currency
+    is unknown. With `account_transactions` the transactions of the
+    tracked accounts are requested one account at a time instead of those
+    of the whole budget.
+    """
+
+    needed = set(BUDGET_SENSOR_ENDPOINTS)
+    if categories:
+        needed |= CATEGORY_SENSOR_ENDPOINTS
+    if accounts:
+        needed |= ACCOUNT_SENSOR_ENDPOINTS
+    if forecast:
+        needed |= FORECAST_SENSOR_ENDPOINTS
+    if not currency_known:
+        needed.add(Endpoint.SETTINGS)
+    if account_transactions:
+        needed.discard(Endpoint.TRANSACTIONS)
+        needed.add(Endpoint.ACCOUNT_TRANSACTIONS)
+
+    return sorted(needed)
@@ -0,0 +1,76 @@
+import logging
+import random
+import time
+
+from custom_components.ynab.const import BACKOFF_BASE, BACKOFF_MAX, CIRCUIT_FAILURE_THRESHOLD
+
+_LOGGER = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+def jittered(seconds: float) -> float:
+    """Return a delay between half and all of `seconds`, so retries of many clients spread out."""
+    return seconds / 2 + random.uniform(0, seconds / 2)
+
+class CircuitBreaker:
+    """Stop calling YNAB after repeated failures, retrying with jittered exponential backoff."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.retry_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self.failures < CIRCUIT_FAILURE_THRESHOLD:
+            return CLOSED
+        if self.retry_at is not None and time.monotonic() < self.retry_at:
+            return OPEN
+        return HALF_OPEN
+
+    def allow(self) -> bool:
+        """Return whether a request may be made now."""
+        return self.state != OPEN
+
+    def retry_in(self) -> float | None:
+        """Return the seconds until the next retry, None when no retry is pending."""
+        if self.retry_at is None:
+            return None
+        return max(self.retry_at - time.monotonic(), 0.0)
+
+    def half_open(self):
+        """Let the next request through as the trial, the retry is due."""
+        self.retry_at = None
+
+    def record_success(self):
+        if self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+            _LOGGER.info("YNAB is reachable again for %s, closing the circuit", self.name)
+        self.failures = 0
+        self.retry_at = None
+
+    def record_failure(self) -> float:
+        """Count a failure and return the seconds until the next retry."""
+        self.failures += 1
+        delay = jittered(min(BACKOFF_BASE * 2 ** (self.failures - 1), BACKOFF_MAX))
+        self.retry_at = time.monotonic() + delay
+
+        if self.failures == CIRCUIT_FAILURE_THRESHOLD:
+            _LOGGER.warning(
+                "%s consecutive failures for %s, pausing requests to YNAB",
+                self.failures,
+                self.name,
+            )
+        _LOGGER.debug("Next attempt for %s in %.0f seconds", self.name, delay)
+        return delay
+
+    def record_throttled(self, wait: float) -> float:
+        """Count a 429, opening the circuit for at least `wait` seconds, and return the seconds until the retry."""
+        self.failures = max(self.failures + 1, CIRCUIT_FAILURE_THRESHOLD)
+        # spread the retries of the budgets sharing the quota
+        delay = wait + jittered(BACKOFF_BASE)
+        self.retry_at = time.monotonic() + delay
+
+        _LOGGER.warning("YNAB quota used up for %s, pausing requests for %.0f seconds", self.name, delay)
+        return delay
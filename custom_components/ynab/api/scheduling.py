@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_call_later
+
+class SingleFlight:
+    """Run a coroutine one at a time, callers arriving meanwhile share the run in flight."""
+
+    def __init__(self, hass, run: Callable[[], Awaitable[Any]]):
+        self.hass = hass
+        self._run = run
+        self._task: asyncio.Task | None = None
+        self.joined = 0
+
+    async def async_run(self) -> Any:
+        """Start a run, or join the one in flight, and return its result."""
+        if self._task is None:
+            self._task = self.hass.async_create_task(self._run())
+            self._task.add_done_callback(self._clear_task)
+        else:
+            self.joined += 1
+        # a cancelled caller leaves the run to the others
+        return await asyncio.shield(self._task)
+
+    @callback
+    def _clear_task(self, _task):
+        self._task = None
+
+class RepeatingTimer:
+    """Run a coroutine on a timer, asking for the delay until the next run after each one."""
+
+    def __init__(self, hass, run: Callable[[], Awaitable[Any]], next_delay: Callable[[], float]):
+        self.hass = hass
+        self._run = run
+        self._next_delay = next_delay
+        self._unsub_timer: Callable[[], None] | None = None
+        self._running = False
+
+    @callback
+    def async_start(self, delay: float) -> Callable[[], None]:
+        """Run after `delay` seconds and return a callback that stops the timer."""
+        self._running = True
+        self._schedule(delay)
+        return self.async_stop
+
+    @callback
+    def async_stop(self):
+        self._running = False
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _schedule(self, delay: float):
+        self._unsub_timer = async_call_later(self.hass, delay, self._handle_timer)
+
+    async def _handle_timer(self, _now):
+        self._unsub_timer = None
+        try:
+            await self._run()
+        finally:
+            # stopped while running, e.g. the entry was unloaded, or started again meanwhile
+            if self._running and self._unsub_timer is None:
+                self._schedule(self._next_delay())
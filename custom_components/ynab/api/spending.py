@@ -0,0 +1,219 @@
+import heapq
+import logging
+from datetime import date, timedelta
+
+_LOGGER = logging.getLogger(__name__)
+
+DIMENSIONS = ("payee", "category", "account")
+TOTAL = "total"
+
+# (date, outflow in milliunits, payee id, category id, account id)
+SpendEntry = tuple[str, int, str, str, str]
+# dimension -> id -> milliunits
+Amounts = dict[str, dict[str, int]]
+
+def spend_entries(transaction: dict) -> tuple[list[SpendEntry], dict[tuple[str, str], str]]:
+    """Return the outflows of a transaction and the names of what they are keyed by.
+
+    Split transactions are counted by their subtransactions, transfers
+    between accounts and inflows are not spending.
+    """
+
+    entries = []
+    names = {("account", transaction["account_id"]): transaction.get("account_name") or transaction["account_id"]}
+    for part in transaction.get("subtransactions") or [transaction]:
+        if part.get("deleted") or part.get("transfer_account_id") or part["amount"] >= 0:
+            continue
+
+        payee_id = part.get("payee_id") or transaction.get("payee_id") or ""
+        category_id = part.get("category_id") or ""
+        names[("payee", payee_id)] = part.get("payee_name") or transaction.get("payee_name") or "No payee"
+        names[("category", category_id)] = part.get("category_name") or "Uncategorized"
+        entries.append((transaction["date"], -part["amount"], payee_id, category_id, transaction["account_id"]))
+
+    return entries, names
+
+def add_amounts(amounts: Amounts, entry: SpendEntry, sign: int):
+    _, amount, *keys = entry
+    amount *= sign
+    for dimension, key in zip((TOTAL, *DIMENSIONS), ("", *keys)):
+        values = amounts[dimension]
+        value = values.get(key, 0) + amount
+        if value:
+            values[key] = value
+        else:
+            del values[key]
+
+def merge_amounts(amounts: Amounts, other: Amounts, sign: int):
+    for dimension, values in other.items():
+        target = amounts[dimension]
+        for key, amount in values.items():
+            value = target.get(key, 0) + sign * amount
+            if value:
+                target[key] = value
+            else:
+                target.pop(key, None)
+
+def window_days(name: str) -> int | None:
+    """Return the days of a window like "30d", None for "month" (month to date)."""
+    if name == "month":
+        return None
+    if name.endswith("d") and name[:-1].isdigit() and int(name[:-1]) > 0:
+        return int(name[:-1])
+    raise ValueError(f"Unknown spending window {name!r}, expected a number of days like 30d, or month")
+
+def empty_amounts() -> Amounts:
+    return {dimension: {} for dimension in (TOTAL, *DIMENSIONS)}
+
+class SpendingWindow:
+    """Running outflow totals over the days from `start` to `end`, both included."""
+
+    __slots__ = ("name", "days", "start", "end", "amounts")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.days = window_days(name)
+        self.start: str | None = None
+        self.end: str | None = None
+        self.amounts = empty_amounts()
+
+    def start_for(self, today: date) -> date:
+        if self.days is None:
+            return today.replace(day=1)
+        return today - timedelta(days=self.days - 1)
+
+    def covers(self, day: str) -> bool:
+        return self.start is not None and self.start <= day <= self.end
+
+class SpendingIndex:
+    """Outflows per payee, category and account over rolling windows, updated per changed transaction and day."""
+
+    def __init__(self, windows: list[str]):
+        self.windows = [SpendingWindow(window) for window in windows]
+        self.retain_days = max((window.days or 31 for window in self.windows), default=0)
+        self.today: date | None = None
+        self.retain_from: str | None = None
+        self.names: dict[tuple[str, str], str] = {}
+        self._records: dict[str, list[SpendEntry]] = {}
+        self._days: dict[str, Amounts] = {}
+
+    def clear(self):
+        """Forget all transactions, for a full refetch."""
+        self._records = {}
+        self._days = {}
+        for window in self.windows:
+            window.amounts = empty_amounts()
+
+    def remove_account(self, account_id: str):
+        """Forget the transactions of an account, for a full refetch of it."""
+        for transaction_id in [
+            transaction_id for transaction_id, entries in self._records.items() if entries[0][4] == account_id
+        ]:
+            self.update(transaction_id, None)
+
+    def update(self, transaction_id: str, transaction: dict | None):
+        """Account for a transaction changing, None when it was deleted."""
+
+        for entry in self._records.pop(transaction_id, ()):
+            self._apply(entry, -1)
+
+        if transaction is None or not self.windows:
+            return
+        if self.retain_from is not None and transaction["date"] < self.retain_from:
+            return
+
+        entries, names = spend_entries(transaction)
+        if not entries:
+            return
+
+        self.names.update(names)
+        self._records[transaction_id] = entries
+        for entry in entries:
+            self._apply(entry, 1)
+
+    def _apply(self, entry: SpendEntry, sign: int):
+        day = self._days.get(entry[0])
+        if day is None:
+            day = self._days[entry[0]] = empty_amounts()
+        add_amounts(day, entry, sign)
+        if not day[TOTAL]:
+            del self._days[entry[0]]
+
+        for window in self.windows:
+            if window.covers(entry[0]):
+                add_amounts(window.amounts, entry, sign)
+
+    def advance(self, today: date):
+        """Move the windows to end on `today`."""
+
+        if today == self.today:
+            return
+
+        for window in self.windows:
+            start = window.start_for(today)
+            if window.start is None or not date.fromisoformat(window.start) <= start <= date.fromisoformat(window.end) + timedelta(days=1):
+                # first use, or no overlap with the old window
+                window.amounts = empty_amounts()
+                self._add_days(window, start, today, 1)
+            else:
+                # subtract the days that left, add the days that came in
+                self._add_days(window, date.fromisoformat(window.start), start - timedelta(days=1), -1)
+                self._add_days(window, date.fromisoformat(window.end) + timedelta(days=1), today, 1)
+            window.start, window.end = start.isoformat(), today.isoformat()
+
+        self.today = today
+        self._prune(min((window.start for window in self.windows), default=today.isoformat()))
+
+    def _add_days(self, window: SpendingWindow, first: date, last: date, sign: int):
+        day = first
+        while day <= last:
+            amounts = self._days.get(day.isoformat())
+            if amounts is not None:
+                merge_amounts(window.amounts, amounts, sign)
+            day += timedelta(days=1)
+
+    def _prune(self, retain_from: str):
+        if retain_from == self.retain_from:
+            return
+
+        self.retain_from = retain_from
+        for day in [day for day in self._days if day < retain_from]:
+            del self._days[day]
+        for transaction_id, entries in list(self._records.items()):
+            kept = [entry for entry in entries if entry[0] >= retain_from]
+            if not kept:
+                del self._records[transaction_id]
+            elif len(kept) != len(entries):
+                self._records[transaction_id] = kept
+
+    def summary(self, window: SpendingWindow, top: int) -> tuple[int, dict[str, dict[str, int]]]:
+        """Return the window's total outflow and its `top` largest outflows per dimension, by name."""
+
+        breakdown = {}
+        for dimension in DIMENSIONS:
+            largest = {}
+            for key, amount in heapq.nlargest(top, window.amounts[dimension].items(), key=lambda item: item[1]):
+                name = self.names.get((dimension, key), key)
+                largest[name] = largest.get(name, 0) + amount
+            breakdown[dimension] = largest
+        return window.amounts[TOTAL].get("", 0), breakdown
+
+    def as_dict(self) -> dict:
+        return {
+            "retain_days": self.retain_days,
+            "records": self._records,
+            "names": [[dimension, key, name] for (dimension, key), name in self.names.items()],
+        }
+
+    def restore(self, data: dict) -> bool:
+        """Load what `as_dict` returned, False if it does not cover the windows."""
+
+        if data["retain_days"] < self.retain_days:
+            return False
+
+        self.names = {(dimension, key): name for dimension, key, name in data["names"]}
+        for transaction_id, entries in data["records"].items():
+            self._records[transaction_id] = [tuple(entry) for entry in entries]
+            for entry in self._records[transaction_id]:
+                self._apply(entry, 1)
+        return True
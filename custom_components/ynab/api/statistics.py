@@ -0,0 +1,199 @@
+import logging
+from datetime import date, timedelta
+from typing import Callable
+
+from homeassistant.core import callback
+from homeassistant.util import dt as dt_util
+
+from custom_components.ynab.api.analytics import months_before
+from custom_components.ynab.api.client import YnabApiClient, YnabApiError
+from custom_components.ynab.api.scheduling import RepeatingTimer, SingleFlight
+from custom_components.ynab.const import BACKFILL_DELAY, DOMAIN, STATISTICS_BATCH
+
+_LOGGER = logging.getLogger(__name__)
+
+ACCOUNT_STATISTIC = "account"
+CATEGORY_STATISTIC = "category"
+
+def statistic_id(kind: str, item_id: str) -> str:
+    """Return the external statistic id of an account or category."""
+    return f"{DOMAIN}:{kind}_{item_id.replace('-', '_').lower()}"
+
+def daily_balances(deltas: dict[str, int], last: date, after: date | None) -> list[tuple[date, int]]:
+    """Return the closing balance of every day after `after` up to `last`.
+
+    `deltas` holds the net amount of each day (YYYY-MM-DD) in milliunits,
+    balances start at zero before the first of them.
+    """
+
+    if not deltas:
+        return []
+
+    balances = []
+    balance = 0
+    day = date.fromisoformat(min(deltas))
+    while day <= last:
+        balance += deltas.get(day.isoformat(), 0)
+        if after is None or day > after:
+            balances.append((day, balance))
+        day += timedelta(days=1)
+    return balances
+
+def monthly_balances(balances: dict[str, int], after: date | None) -> list[tuple[date, int]]:
+    """Return the balances of the months (YYYY-MM-01) after `after`."""
+    return [
+        (day, balance)
+        for day, balance in sorted((date.fromisoformat(month), balance) for month, balance in balances.items())
+        if after is None or day > after
+    ]
+
+def last_imported(hass, statistic_ids: list[str]) -> dict[str, date | None]:
+    """Return the day of the last imported point of each statistic, blocking."""
+    from homeassistant.components.recorder.statistics import get_last_statistics
+
+    last = {}
+    for statistic in statistic_ids:
+        rows = get_last_statistics(hass, 1, statistic, False, {"state"}).get(statistic)
+        last[statistic] = dt_util.as_local(dt_util.utc_from_timestamp(rows[0]["start"])).date() if rows else None
+    return last
+
+class StatisticsBackfill:
+    """Import the history of account and category balances as long-term statistics."""
+
+    def __init__(
+        self,
+        hass,
+        client: YnabApiClient,
+        budget_id: str,
+        budget_name: str,
+        interval: timedelta,
+        model: Callable[[], object | None],
+    ):
+        self.hass = hass
+        self.client = client
+        self.budget_id = budget_id
+        self.budget_name = budget_name
+        self.interval = interval
+        self._model = model
+        self._backfill = SingleFlight(hass, self._async_backfill)
+        self._timer = RepeatingTimer(hass, self.async_backfill, self.interval.total_seconds)
+
+    @callback
+    def async_start(self) -> Callable[[], None]:
+        """Start backfilling once startup has settled and return a callback that stops it."""
+        return self._timer.async_start(BACKFILL_DELAY)
+
+    async def async_backfill(self) -> int:
+        """Import the missing statistics, returns the number of imported points."""
+        return await self._backfill.async_run()
+
+    async def _async_backfill(self) -> int:
+        data = self._model()
+        if "recorder" not in self.hass.config.components or data is None:
+            return 0
+        # the recorder pulls in SQLAlchemy, only load it once there is something to import
+        from homeassistant.components.recorder import get_instance
+
+        today = dt_util.now().date()
+        last_day = today - timedelta(days=1)
+        current_month = today.replace(day=1).isoformat()
+        last_month = date.fromisoformat(months_before(current_month, 1))
+
+        accounts = {statistic_id(ACCOUNT_STATISTIC, account_id): account_id for account_id in data.accounts}
+        categories = {statistic_id(CATEGORY_STATISTIC, category_id): category_id for category_id in data.categories}
+        last = await get_instance(self.hass).async_add_executor_job(
+            last_imported, self.hass, [*accounts, *categories]
+        )
+
+        # the day or month of the last imported point, of the statistics that are behind
+        accounts = {
+            account_id: last[statistic]
+            for statistic, account_id in accounts.items()
+            if last[statistic] is None or last[statistic] < last_day
+        }
+        categories = {
+            category_id: last[statistic]
+            for statistic, category_id in categories.items()
+            if last[statistic] is None or last[statistic] < last_month
+        }
+        if not accounts and not categories:
+            _LOGGER.debug("Statistics of budget %s are up to date", self.budget_id)
+            return 0
+
+        deltas: dict[str, dict[str, int]] = {account_id: {} for account_id in accounts}
+        balances: dict[str, dict[str, int]] = {category_id: {} for category_id in categories}
+
+        def add_transaction(transaction: dict):
+            days = deltas.get(transaction["account_id"])
+            if days is not None and not transaction.get("deleted"):
+                days[transaction["date"]] = days.get(transaction["date"], 0) + transaction["amount"]
+
+        def add_month(month: dict):
+            if month["month"] >= current_month or month.get("deleted"):
+                return
+            for category in month.get("categories", []):
+                months = balances.get(category["id"])
+                if months is not None and not category.get("deleted"):
+                    months[month["month"]] = category["balance"]
+
+        _LOGGER.debug(
+            "Backfilling statistics of %s accounts and %s categories of budget %s",
+            len(accounts),
+            len(categories),
+            self.budget_id,
+        )
+        try:
+            await self.client.stream(
+                "GET",
+                f"/budgets/{self.budget_id}",
+                {
+                    "data.budget.transactions.item": add_transaction,
+                    "data.budget.months.item": add_month,
+                },
+            )
+        except YnabApiError as error:
+            _LOGGER.debug("Unable to fetch the history of budget %s - %s", self.budget_id, error)
+            return 0
+
+        imported = 0
+        for account_id, after in accounts.items():
+            imported += self._import(
+                statistic_id(ACCOUNT_STATISTIC, account_id),
+                data.accounts[account_id].name,
+                data.currency_iso,
+                daily_balances(deltas[account_id], last_day, after),
+            )
+        for category_id, after in categories.items():
+            imported += self._import(
+                statistic_id(CATEGORY_STATISTIC, category_id),
+                data.categories[category_id].name,
+                data.currency_iso,
+                monthly_balances(balances[category_id], after),
+            )
+
+        _LOGGER.debug("Imported %s statistics points for budget %s", imported, self.budget_id)
+        return imported
+
+    @callback
+    def _import(self, statistic: str, name: str, currency: str | None, balances: list[tuple[date, int]]) -> int:
+        if not balances:
+            return 0
+        from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{self.budget_name} {name}",
+            source=DOMAIN,
+            statistic_id=statistic,
+            unit_of_measurement=currency,
+        )
+        # a point per day or month, at its local midnight, holding the closing balance
+        points = [
+            StatisticData(start=dt_util.start_of_local_day(day), state=balance / 1000, sum=balance / 1000)
+            for day, balance in balances
+        ]
+        for start in range(0, len(points), STATISTICS_BATCH):
+            async_add_external_statistics(self.hass, metadata, points[start:start + STATISTICS_BATCH])
+        return len(points)
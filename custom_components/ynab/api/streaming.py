@@ -0,0 +1,120 @@
+import time
+from typing import Any, Callable, Iterator
+
+import ijson
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    # orjson comes with Home Assistant, the standard library decodes bytes as well
+    from json import loads as json_loads
+
+from custom_components.ynab.api.instrumentation import StreamStats
+
+READ_SIZE = 65536
+
+class MeasuredReader:
+    """Async file-like wrapper counting bytes and the time spent waiting for them."""
+
+    def __init__(self, source, stats: StreamStats):
+        self._source = source
+        self._stats = stats
+
+    async def read(self, size: int = -1) -> bytes:
+        started = time.perf_counter()
+        chunk = await self._source.read(size)
+        self._stats.read_seconds += time.perf_counter() - started
+        self._stats.bytes += len(chunk)
+        return chunk
+
+async def dispatch_items(source, handlers: dict[str, Callable[[Any], None]]):
+    """Parse a JSON document incrementally, handing each value under a prefix to its handler.
+
+    `source` is an async file-like object such as an aiohttp response's
+    `content`. Prefixes use ijson's dotted notation, e.g.
+    `data.budget.transactions.item` for each element of that array. Only
+    the value currently being built is held in memory, so the size of the
+    document does not matter.
+    """
+
+    builder = None
+    depth = 0
+    handler = None
+
+    async for prefix, event, value in ijson.parse(source, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    handler(builder.value)
+                    builder = None
+            continue
+
+        if prefix not in handlers or event in ("map_key", "end_map", "end_array"):
+            continue
+
+        if event in ("start_map", "start_array"):
+            handler = handlers[prefix]
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+        else:
+            handlers[prefix](value)
+
+
+class PrefixedReader:
+    """Async file-like object returning `prefix` before the rest of `source`."""
+
+    def __init__(self, prefix: bytes | bytearray, source):
+        self._prefix = memoryview(prefix)
+        self._source = source
+
+    async def read(self, size: int = -1) -> bytes:
+        if size == 0:
+            return b""
+        if self._prefix:
+            # in pieces, ijson holds the events of a whole read at once
+            size = READ_SIZE if size < 0 else size
+            chunk, self._prefix = self._prefix[:size], self._prefix[size:]
+            return bytes(chunk)
+        return await self._source.read(size)
+
+def values_at(value, path: list[str]) -> Iterator[Any]:
+    """Yield the values of a decoded document under an ijson style path."""
+    if not path:
+        yield value
+    elif path[0] == "item":
+        if isinstance(value, list):
+            for item in value:
+                yield from values_at(item, path[1:])
+    elif isinstance(value, dict) and path[0] in value:
+        yield from values_at(value[path[0]], path[1:])
+
+def dispatch_document(document, handlers: dict[str, Callable[[Any], None]]):
+    """Hand the values under each prefix of a decoded document to its handler, like `dispatch_items`."""
+    for prefix, handler in handlers.items():
+        for value in values_at(document, prefix.split(".")):
+            handler(value)
+
+async def decode_items(source, handlers: dict[str, Callable[[Any], None]], limit: int):
+    """Hand the values under each prefix to its handler, decoding small documents at once.
+
+    Documents up to `limit` bytes are decoded in one go with orjson, many
+    times faster than building the values from parser events. Larger ones
+    are parsed incrementally by `dispatch_items`, so memory stays bounded
+    by `limit` whatever the size of the budget. The length is found by
+    reading, as compressed and chunked responses do not announce it.
+    """
+
+    buffer = bytearray()
+    while len(buffer) <= limit:
+        chunk = await source.read(READ_SIZE)
+        if not chunk:
+            dispatch_document(json_loads(bytes(buffer)), handlers)
+            return
+        buffer += chunk
+
+    await dispatch_items(PrefixedReader(buffer, source), handlers)
@@ -1,35 +1,111 @@
 from homeassistant import config_entries
+from homeassistant.core import callback
 import logging
 import voluptuous as vol
 from .const import (
+    CONF_ACCOUNT_TRANSACTIONS_KEY,
     CONF_ACCOUNTS_KEY,
     CONF_ACCOUNTS_ALL_KEY,
     CONF_BUDGET_KEY,
+    CONF_BUDGET_NAME_KEY,
     CONF_CATEGORIES_KEY,
     CONF_CATEGORIES_ALL_KEY,
     CONF_CURRENCY_KEY,
-    DOMAIN
+    CONF_FORECAST_DAYS_KEY,
+    CONF_IMPORT_INTERVAL_KEY,
+    CONF_SPENDING_WINDOWS_KEY,
+    DEFAULT_FORECAST_DAYS,
+    DEFAULT_IMPORT_INTERVAL,
+    DEFAULT_SPENDING_WINDOWS,
+    DOMAIN,
+    MAX_FORECAST_DAYS,
+    MAX_IMPORT_INTERVAL,
+    MIN_IMPORT_INTERVAL,
 )
 from homeassistant.const import CONF_API_KEY
 from homeassistant.helpers.selector import selector
-from ynab_sdk import YNAB
+from .api.client import YnabApiError, YnabAuthError
+from .api.metadata import YnabMetadata, async_get_metadata
+from .api.spending import window_days
 
 _LOGGER = logging.getLogger(__name__)
 
-async def init_ynab_and_validate_api_key(hass, api_key: str) -> None:
-    ynab = YNAB(api_key)
-
-    await hass.async_add_executor_job(ynab.budgets.get_budgets)
-
-    return ynab
+async def categories_schema(metadata: YnabMetadata, budget_id: str, defaults: dict) -> vol.Schema:
+    categories_by_name = {}
+    for category_group in await metadata.async_get_category_groups(budget_id):
+        if category_group["deleted"] is False and category_group["hidden"] is False and category_group["name"] != "Internal Master Category":
+            for category in category_group["categories"]:
+                if category["deleted"] is False and category["hidden"] is False:
+                    categories_by_name[category_group["name"] + " - " + category["name"]] = category
+
+    return vol.Schema({
+        vol.Required(CONF_CATEGORIES_ALL_KEY, default=defaults.get(CONF_CATEGORIES_ALL_KEY, False)): bool,
+        vol.Optional(CONF_CATEGORIES_KEY, default=defaults.get(CONF_CATEGORIES_KEY, [])): selector({
+            "select": {
+                "options": [{"label": name, "value": category["id"]} for name, category in categories_by_name.items()],
+                "multiple": True
+            }
+        })
+    })
+
+async def accounts_schema(metadata: YnabMetadata, budget_id: str, defaults: dict) -> vol.Schema:
+    accounts = await metadata.async_get_accounts(budget_id)
+
+    return vol.Schema({
+        vol.Required(CONF_ACCOUNTS_ALL_KEY, default=defaults.get(CONF_ACCOUNTS_ALL_KEY, False)): bool,
+        vol.Optional(CONF_ACCOUNTS_KEY, default=defaults.get(CONF_ACCOUNTS_KEY, [])): selector({
+            "select": {
+                "options": [{"label": account["name"], "value": account["id"]} for account in accounts],
+                "multiple": True
+            }
+        }),
+        vol.Required(
+            CONF_ACCOUNT_TRANSACTIONS_KEY, default=defaults.get(CONF_ACCOUNT_TRANSACTIONS_KEY, False)
+        ): bool,
+    })
+
+def settings_schema(defaults: dict) -> vol.Schema:
+    return vol.Schema({
+        vol.Required(
+            CONF_IMPORT_INTERVAL_KEY, default=defaults.get(CONF_IMPORT_INTERVAL_KEY, DEFAULT_IMPORT_INTERVAL)
+        ): vol.All(vol.Coerce(int), vol.Range(min=MIN_IMPORT_INTERVAL, max=MAX_IMPORT_INTERVAL)),
+        vol.Optional(
+            CONF_SPENDING_WINDOWS_KEY, default=defaults.get(CONF_SPENDING_WINDOWS_KEY, DEFAULT_SPENDING_WINDOWS)
+        ): selector({
+            "select": {
+                "options": DEFAULT_SPENDING_WINDOWS,
+                "multiple": True,
+                "custom_value": True
+            }
+        }),
+        vol.Required(
+            CONF_FORECAST_DAYS_KEY, default=defaults.get(CONF_FORECAST_DAYS_KEY, DEFAULT_FORECAST_DAYS)
+        ): vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_FORECAST_DAYS)),
+    })
+
+def valid_windows(windows: list[str]) -> bool:
+    try:
+        for window in windows:
+            window_days(window)
+    except ValueError:
+        return False
+    return True
+
+def selection(user_input: dict, all_key: str, key: str) -> dict:
+    return {all_key: user_input[all_key], key: user_input.get(key, [])}
 
 class YnabConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
-    ynab: YNAB
+    metadata: YnabMetadata
 
     def __init__(self) -> None:
         super().__init__()
-        self.ynab = None
+        self.metadata = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        return YnabOptionsFlow(config_entry)
 
     async def async_step_user(self, user_input=None):
         errors = {}
@@ -37,11 +113,16 @@ class YnabConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             _LOGGER.debug("Validating API Key")
             try:
-                self.ynab = await init_ynab_and_validate_api_key(self.hass, user_input[CONF_API_KEY])
+                self.metadata = async_get_metadata(self.hass, user_input[CONF_API_KEY])
+                # listing the budgets validates the key, the flow reuses them
+                self.metadata.invalidate()
+                await self.metadata.async_get_budgets()
                 self.data = {CONF_API_KEY: user_input[CONF_API_KEY]}
                 return await self.async_step_budgets()
-            except AssertionError:
+            except YnabAuthError:
                 errors["base"] = "auth"
+            except YnabApiError:
+                errors["base"] = "cannot_connect"
 
         data_schema = {
             vol.Required(CONF_API_KEY): str
@@ -58,18 +139,18 @@ class YnabConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(budget_id)
             self._abort_if_unique_id_configured()
 
-            budget = (await self.hass.async_add_executor_job(self.ynab.budgets.get_budget, budget_id)).data.budget
+            budget = await self.metadata.async_get_budget(budget_id)
 
-            self.data["budget_name"] = budget.name
-            self.data[CONF_CURRENCY_KEY] = budget.currency_format.iso_code
+            self.data[CONF_BUDGET_NAME_KEY] = budget["name"]
+            self.data[CONF_CURRENCY_KEY] = budget["currency_format"]["iso_code"]
             return await self.async_step_categories()
 
-        budgets_response = await self.hass.async_add_executor_job(self.ynab.budgets.get_budgets)
+        budgets = await self.metadata.async_get_budgets()
 
         data_schema = {
             vol.Required(CONF_BUDGET_KEY): selector({
                 "select": {
-                    "options": [{"label": budget.name, "value": budget.id} for budget in budgets_response.data.budgets],
+                    "options": [{"label": budget["name"], "value": budget["id"]} for budget in budgets],
                     "multiple": False
                 }
             })
@@ -79,63 +160,76 @@ class YnabConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_categories(self, user_input=None):
         if user_input is not None:
-            self.data[CONF_CATEGORIES_ALL_KEY] = user_input[CONF_CATEGORIES_ALL_KEY]
-            if CONF_CATEGORIES_KEY in user_input:
-                self.data[CONF_CATEGORIES_KEY] = user_input[CONF_CATEGORIES_KEY]
-            else:
-                self.data[CONF_CATEGORIES_KEY] = []
-
+            self.data.update(selection(user_input, CONF_CATEGORIES_ALL_KEY, CONF_CATEGORIES_KEY))
             return await self.async_step_accounts()
 
-        categories_by_name = await self.fetch_categories()
+        data_schema = await categories_schema(self.metadata, self.data[CONF_BUDGET_KEY], {})
+        return self.async_show_form(step_id="categories", data_schema=data_schema)
 
-        data_schema = {
-            vol.Required(CONF_CATEGORIES_ALL_KEY): bool,
-            vol.Optional(CONF_CATEGORIES_KEY): selector({
-                "select": {
-                    "options": [{"label": name, "value": category.id} for name, category in categories_by_name.items()],
-                    "multiple": True
-                }
-            })
-        }
+    async def async_step_accounts(self, user_input=None):
+        if user_input is not None:
+            self.data.update(selection(user_input, CONF_ACCOUNTS_ALL_KEY, CONF_ACCOUNTS_KEY))
+            self.data[CONF_ACCOUNT_TRANSACTIONS_KEY] = user_input.get(CONF_ACCOUNT_TRANSACTIONS_KEY, False)
+
+            return self.async_create_entry(
+                title=self.data[CONF_BUDGET_NAME_KEY],
+                data=self.data
+            )
 
-        return self.async_show_form(step_id="categories", data_schema=vol.Schema(data_schema))
+        data_schema = await accounts_schema(self.metadata, self.data[CONF_BUDGET_KEY], {})
+        return self.async_show_form(step_id="accounts", data_schema=data_schema)
 
-    async def fetch_categories(self):
-        categories_response = await self.hass.async_add_executor_job(self.ynab.categories.get_categories, self.data["budget"])
-        categories_by_name = {}
-        for category_group in categories_response.data.category_groups:
-            if category_group.deleted is False and category_group.hidden is False and category_group.name != "Internal Master Category":
-                for category in category_group.categories:
-                    if category.deleted is False and category.hidden is False:
-                        categories_by_name[category_group.name + " - " + category.name] = category
+class YnabOptionsFlow(config_entries.OptionsFlow):
+    """Change the categories and accounts of a budget."""
 
-        return categories_by_name
+    def __init__(self, config_entry) -> None:
+        self.entry = config_entry
+        self.current = {**config_entry.data, **config_entry.options}
+        self.options = dict(config_entry.options)
+        self.metadata = None
 
+    async def async_step_init(self, user_input=None):
+        self.metadata = async_get_metadata(self.hass, self.entry.data[CONF_API_KEY])
+        return await self.async_step_categories()
 
-    async def async_step_accounts(self, user_input=None):
+    async def async_step_categories(self, user_input=None):
         if user_input is not None:
-            self.data[CONF_ACCOUNTS_ALL_KEY] = user_input[CONF_ACCOUNTS_ALL_KEY]
-            if CONF_ACCOUNTS_KEY in user_input:
-                self.data[CONF_ACCOUNTS_KEY] = user_input[CONF_ACCOUNTS_KEY]
-            else:
-                self.data[CONF_ACCOUNTS_KEY] = []
+            self.options.update(selection(user_input, CONF_CATEGORIES_ALL_KEY, CONF_CATEGORIES_KEY))
+            return await self.async_step_accounts()
 
-            return self.async_create_entry(
-                title=self.data["budget_name"],
-                data=self.data
-            )
+        try:
+            data_schema = await categories_schema(self.metadata, self.current[CONF_BUDGET_KEY], self.current)
+        except YnabAuthError:
+            return self.async_abort(reason="auth")
+        except YnabApiError:
+            return self.async_abort(reason="cannot_connect")
 
-        accounts_response = await self.hass.async_add_executor_job(self.ynab.accounts.get_accounts, self.data["budget"])
+        return self.async_show_form(step_id="categories", data_schema=data_schema)
 
-        data_schema = {
-            vol.Required(CONF_ACCOUNTS_ALL_KEY): bool,
-            vol.Optional(CONF_ACCOUNTS_KEY): selector({
-                "select": {
-                    "options": [{"label": account.name, "value": account.id} for account in accounts_response.data.accounts],
-                    "multiple": True
-                }
-            })
-        }
+    async def async_step_accounts(self, user_input=None):
+        if user_input is not None:
+            self.options.update(selection(user_input, CONF_ACCOUNTS_ALL_KEY, CONF_ACCOUNTS_KEY))
+            self.options[CONF_ACCOUNT_TRANSACTIONS_KEY] = user_input.get(CONF_ACCOUNT_TRANSACTIONS_KEY, False)
+            return await self.async_step_settings()
 
-        return self.async_show_form(step_id="accounts", data_schema=vol.Schema(data_schema))
\ No newline at end of file
+        try:
+            data_schema = await accounts_schema(self.metadata, self.current[CONF_BUDGET_KEY], self.current)
+        except YnabAuthError:
+            return self.async_abort(reason="auth")
+        except YnabApiError:
+            return self.async_abort(reason="cannot_connect")
+
+        return self.async_show_form(step_id="accounts", data_schema=data_schema)
+
+    async def async_step_settings(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            windows = list(dict.fromkeys(user_input.get(CONF_SPENDING_WINDOWS_KEY, [])))
+            if valid_windows(windows):
+                self.options.update({**user_input, CONF_SPENDING_WINDOWS_KEY: windows})
+                return self.async_create_entry(title="", data=self.options)
+            errors[CONF_SPENDING_WINDOWS_KEY] = "spending_windows"
+
+        return self.async_show_form(
+            step_id="settings", data_schema=settings_schema(user_input or self.current), errors=errors
+        )
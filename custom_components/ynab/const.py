@@ -25,6 +25,44 @@ DEFAULT_NAME = "ynab"
 DEFAULT_BUDGET = "last-used"
 DEFAULT_CURRENCY = "$"
 DEFAULT_API_ENDPOINT = "https://api.ynab.com/v1"
+REQUEST_TIMEOUT = 30
+# responses up to this many bytes are decoded at once instead of streamed
+DECODE_IN_MEMORY_LIMIT = 1048576
+# days back the transactions of tracked accounts are always requested, bank imports arrive backdated
+TRANSACTION_LOOKBACK_DAYS = 30
+
+# YNAB allows DEFAULT_RATE_LIMIT requests per token in a rolling window
+DEFAULT_RATE_LIMIT = 200
+RATE_LIMIT_WINDOW = 3600
+RATE_LIMIT_RESERVE = 0.25
+MIN_REFRESH_INTERVAL = 120
+MAX_REFRESH_INTERVAL = 3600
+# retries after failed refreshes, and how long the last good data is served
+BACKOFF_BASE = 30
+BACKOFF_MAX = 3600
+CIRCUIT_FAILURE_THRESHOLD = 3
+STALE_DATA_MAX_AGE = 86400
+# requested refreshes within this many seconds of one another are merged
+REFRESH_COOLDOWN = 10
+DEFAULT_IMPORT_INTERVAL = 300
+MIN_IMPORT_INTERVAL = 60
+MAX_IMPORT_INTERVAL = 3600
+ANALYTICS_HISTORY_MONTHS = 12
+ANALYTICS_AVERAGE_MONTHS = 3
+# 7 and 30 days ending today, and month to date
+DEFAULT_SPENDING_WINDOWS = ["7d", "30d", "month"]
+SPENDING_TOP = 10
+# days ahead the scheduled transactions are projected, 0 turns the forecast off
+DEFAULT_FORECAST_DAYS = 30
+MAX_FORECAST_DAYS = 365
+METADATA_TTL = 300
+# seconds after startup and between backfills of the long-term statistics
+BACKFILL_DELAY = 300
+BACKFILL_INTERVAL = 86400
+STATISTICS_BATCH = 1000
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60
 
 ICON = "mdi:finance"
 
@@ -38,4 +76,11 @@ CONF_CATEGORIES_KEY = "categories"
 CONF_CATEGORIES_ALL_KEY = "categories_include_all"
 CONF_ACCOUNTS_KEY = "accounts"
 CONF_ACCOUNTS_ALL_KEY = "accounts_include_all"
-CONF_CURRENCY_KEY = "currency"
\ No newline at end of file
+CONF_CURRENCY_KEY = "currency"
+CONF_IMPORT_INTERVAL_KEY = "import_interval"
+CONF_SPENDING_WINDOWS_KEY = "spending_windows"
+CONF_FORECAST_DAYS_KEY = "forecast_days"
+CONF_ACCOUNT_TRANSACTIONS_KEY = "account_transactions"
+
+SERVICE_REFRESH = "refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
\ No newline at end of file
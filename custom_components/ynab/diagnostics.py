@@ -0,0 +1,35 @@
+"""Diagnostics support for ynab."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_API_KEY
+
+from .const import DOMAIN_DATA
+
+TO_REDACT = {CONF_API_KEY}
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN_DATA]["coordinators"][entry.entry_id]
+    hub = coordinator.hub
+    snapshot = coordinator.snapshot
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "last_update_success": coordinator.last_update_success,
+        "joined_refreshes": coordinator.joined_refreshes,
+        "rate_limit": {
+            "used": hub.used,
+            "limit": hub.limit,
+            "requests_per_refresh": hub.requests_per_refresh,
+            "refresh_interval": hub.interval(),
+            "budgets": len(hub.coordinators),
+        },
+        "import_delay": coordinator.importer.delay.total_seconds(),
+        "snapshot": {
+            "knowledge": snapshot.knowledge,
+            "current_month": snapshot.current_month,
+            "accounts": len(snapshot.accounts),
+            "months": len(snapshot.months),
+            "transactions": len(snapshot.transactions),
+        },
+        "refreshes": coordinator.instrumentation.as_dict(),
+    }
@@ -1,13 +1,20 @@
 """Sensor platform for ynab."""
 import logging
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
 
-from .const import (DOMAIN, CONF_ACCOUNTS_KEY, CONF_ACCOUNTS_ALL_KEY,
-                    CONF_BUDGET_KEY, CONF_CATEGORIES_KEY,
-                    CONF_CATEGORIES_ALL_KEY, CONF_BUDGET_NAME_KEY)
+from .const import DOMAIN, DOMAIN_DATA, CONF_BUDGET_KEY, CONF_BUDGET_NAME_KEY
 from .sensors.balance_sensor import CategorySensor, AccountSensor
 from .sensors.budget_sensor import BudgetSensor
-from .api.data_coordinator import YnabDataCoordinator
+from .sensors.forecast_sensor import (
+    LowestProjectedBalanceDateSensor,
+    LowestProjectedBalanceSensor,
+    ProjectedBalanceSensor,
+)
+from .sensors.diagnostic_sensor import ApiQuotaSensor, LastSyncedSensor, RefreshDurationSensor, ResponseSizeSensor
+from .sensors.spending_sensor import SpendingSensor
+from .api.data_coordinator import ACCOUNT_CONTEXT, CATEGORY_CONTEXT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,8 +24,7 @@ async def async_setup_entry(
     """Set up sensor platform."""
     _LOGGER.debug("Setting up entities")
 
-    coordinator = YnabDataCoordinator(hass, config_entry.data)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = hass.data[DOMAIN_DATA]["coordinators"][config_entry.entry_id]
 
     budget_id = config_entry.data[CONF_BUDGET_KEY]
     budget_name = config_entry.data[CONF_BUDGET_NAME_KEY]
@@ -30,24 +36,56 @@ async def async_setup_entry(
         identifiers={(DOMAIN, budget_id)}
     )
 
-    sensors = [BudgetSensor(coordinator, budget_id, budget_name, device_info)]
+    sensors = [
+        BudgetSensor(coordinator, budget_id, budget_name, device_info),
+        RefreshDurationSensor(coordinator, budget_id, device_info),
+        ResponseSizeSensor(coordinator, budget_id, device_info),
+        ApiQuotaSensor(coordinator, budget_id, device_info),
+        LastSyncedSensor(coordinator, budget_id, device_info),
+    ]
+    sensors.extend(
+        SpendingSensor(coordinator, window, budget_id, device_info) for window in coordinator.data.spending
+    )
+    if coordinator.forecast_days > 0:
+        sensors.extend([
+            ProjectedBalanceSensor(coordinator, budget_id, device_info),
+            LowestProjectedBalanceSensor(coordinator, budget_id, device_info),
+            LowestProjectedBalanceDateSensor(coordinator, budget_id, device_info),
+        ])
+
+    @callback
+    def create_sensor(context):
+        kind, data_id = context
+        if kind == ACCOUNT_CONTEXT:
+            sensor = AccountSensor(coordinator, account_id=data_id, device_info=device_info, budget_name=budget_name)
+        else:
+            sensor = CategorySensor(coordinator, category_id=data_id, device_info=device_info, budget_name=budget_name)
+        balance_sensors[context] = sensor
+        return sensor
 
-    categories = []
-    if config_entry.data[CONF_CATEGORIES_ALL_KEY]:
-        categories = coordinator.data.categories.keys()
-    elif CONF_CATEGORIES_KEY in config_entry.data:
-        categories = config_entry.data[CONF_CATEGORIES_KEY]
+    @callback
+    def update_members(added: set, removed: set):
+        """Add sensors for new accounts and categories, and remove those of deleted ones."""
+        registry = er.async_get(hass)
+        for context in removed:
+            sensor = balance_sensors.pop(context, None)
+            if sensor is None:
+                continue
+            if sensor.registry_entry is not None:
+                registry.async_remove(sensor.entity_id)
+            else:
+                hass.async_create_task(sensor.async_remove())
 
-    for category in categories:
-        sensors.append(CategorySensor(coordinator, category_id=category, device_info=device_info, budget_name=budget_name))
+        if added:
+            async_add_entities([create_sensor(context) for context in added])
 
-    accounts = []
-    if config_entry.data[CONF_ACCOUNTS_ALL_KEY]:
-        accounts = coordinator.data.accounts.keys()
-    elif CONF_ACCOUNTS_KEY in config_entry.data:
-        accounts = config_entry.data[CONF_ACCOUNTS_KEY]
+    # the coordinator data only holds the selected accounts and categories
+    balance_sensors = {}
+    for category in coordinator.data.categories:
+        sensors.append(create_sensor((CATEGORY_CONTEXT, category)))
 
-    for account in accounts:
-        sensors.append(AccountSensor(coordinator, account_id=account, device_info=device_info, budget_name=budget_name))
+    for account in coordinator.data.accounts:
+        sensors.append(create_sensor((ACCOUNT_CONTEXT, account)))
 
-    async_add_entities(sensors, update_before_add=True)
\ No newline at end of file
+    config_entry.async_on_unload(coordinator.async_add_membership_listener(update_members))
+    async_add_entities(sensors)
@@ -0,0 +1,119 @@
+import logging
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor.const import SensorDeviceClass
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.core import callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.util import dt as dt_util
+
+from custom_components.ynab.api.data_coordinator import YnabDataCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+class DiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """Refresh instrumentation of the budget, disabled until the user enables it."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: YnabDataCoordinator, key: str, name: str, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator)
+
+        self._attr_extra_state_attributes = {}
+        self._attr_unique_id = f"budget_{budget_id}_{key}"
+        self._attr_name = name
+        self._attr_device_info = device_info
+        self._handle_data()
+
+    @property
+    def available(self) -> bool:
+        # diagnostics matter most when refreshes fail
+        return self.coordinator.instrumentation.last is not None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._handle_data()
+        self.async_write_ha_state()
+
+    def _handle_data(self):
+        raise NotImplementedError
+
+class RefreshDurationSensor(DiagnosticSensor):
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+    _attr_suggested_display_precision = 2
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, "refresh_duration", "Refresh duration", budget_id, device_info)
+
+    def _handle_data(self):
+        instrumentation = self.coordinator.instrumentation
+        record = instrumentation.last
+        if record is None:
+            return
+
+        self._attr_native_value = round(record.duration, 3)
+        self._attr_extra_state_attributes["success"] = record.success
+        self._attr_extra_state_attributes["error"] = record.error
+        self._attr_extra_state_attributes["endpoints"] = record.endpoints
+        for phase, seconds in record.phases.items():
+            self._attr_extra_state_attributes[f"{phase}_seconds"] = round(seconds, 3)
+        self._attr_extra_state_attributes["recent_failures"] = sum(
+            1 for refresh in instrumentation.history if not refresh.success
+        )
+        self._attr_extra_state_attributes["last_import"] = instrumentation.last_import
+
+class ResponseSizeSensor(DiagnosticSensor):
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, "response_size", "Response size", budget_id, device_info)
+
+    def _handle_data(self):
+        record = self.coordinator.instrumentation.last
+        if record is not None:
+            self._attr_native_value = record.response_bytes
+
+class ApiQuotaSensor(DiagnosticSensor):
+    _attr_icon = "mdi:api"
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, "api_quota_remaining", "API requests remaining", budget_id, device_info)
+
+    def _handle_data(self):
+        hub = self.coordinator.hub
+        self._attr_native_value = max(hub.limit - hub.used, 0)
+        self._attr_extra_state_attributes["used"] = hub.used
+        self._attr_extra_state_attributes["limit"] = hub.limit
+        self._attr_extra_state_attributes["refresh_interval"] = round(hub.interval())
+
+class LastSyncedSensor(DiagnosticSensor):
+    """When the budget was last refreshed, and whether its sensors show stale data."""
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_state_class = None
+    _attr_entity_registry_enabled_default = True
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, "last_synced", "Last synced", budget_id, device_info)
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_synced is not None
+
+    def _handle_data(self):
+        coordinator = self.coordinator
+        breaker = coordinator.breaker
+        retry_in = breaker.retry_in()
+
+        self._attr_native_value = coordinator.last_synced
+        self._attr_extra_state_attributes["stale"] = coordinator.stale
+        self._attr_extra_state_attributes["consecutive_failures"] = breaker.failures
+        self._attr_extra_state_attributes["circuit"] = breaker.state
+        self._attr_extra_state_attributes["next_attempt"] = (
+            None if retry_in is None else (dt_util.utcnow() + timedelta(seconds=retry_in)).isoformat()
+        )
@@ -0,0 +1,19 @@
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from custom_components.ynab.api.data_coordinator import DataCoordinatorModel
+
+class YnabEntity(CoordinatorEntity):
+    """Entity showing budget data, the last good data while YNAB cannot be reached."""
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.data_available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._handle_data(self.coordinator.data)
+        self.async_write_ha_state()
+
+    def _handle_data(self, data: DataCoordinatorModel):
+        raise NotImplementedError
@@ -0,0 +1,80 @@
+import logging
+from datetime import date
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor.const import SensorDeviceClass
+from homeassistant.helpers.entity import DeviceInfo
+
+from custom_components.ynab.api.data_coordinator import (
+    FORECAST_CONTEXT,
+    YnabDataCoordinator,
+    DataCoordinatorModel,
+    ForecastModel,
+)
+from custom_components.ynab.const import ICON
+from custom_components.ynab.sensors.entity import YnabEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+class ForecastSensor(YnabEntity, SensorEntity):
+    """Total on-budget balance projected from the scheduled transactions."""
+    _attr_has_entity_name = True
+    _attr_icon = ICON
+
+    def __init__(self, coordinator: YnabDataCoordinator, key: str, name: str, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, FORECAST_CONTEXT)
+
+        self._attr_extra_state_attributes = {}
+        self._attr_unique_id = f"budget_{budget_id}_{key}"
+        self._attr_name = name
+        self._attr_device_info = device_info
+        self._handle_data(coordinator.data)
+
+    @property
+    def available(self) -> bool:
+        return super().available and self.coordinator.data.forecast is not None
+
+    def _handle_data(self, data: DataCoordinatorModel):
+        forecast = data.forecast
+        if forecast is None:
+            return
+
+        _LOGGER.debug("Received data for forecast %s", forecast)
+        self._attr_extra_state_attributes["horizon_days"] = forecast.horizon_days
+        self._attr_extra_state_attributes["scheduled_transactions"] = forecast.scheduled_transactions
+        self._handle_forecast(forecast)
+
+    def _handle_forecast(self, forecast: ForecastModel):
+        raise NotImplementedError
+
+class ProjectedBalanceSensor(ForecastSensor):
+    _attr_device_class = SensorDeviceClass.MONETARY
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, "projected_balance", "Projected balance", budget_id, device_info)
+        self._attr_native_unit_of_measurement = self.coordinator.data.currency_iso
+
+    def _handle_forecast(self, forecast: ForecastModel):
+        self._attr_native_value = forecast.projected_balance
+
+class LowestProjectedBalanceSensor(ForecastSensor):
+    _attr_device_class = SensorDeviceClass.MONETARY
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, "lowest_projected_balance", "Lowest projected balance", budget_id, device_info)
+        self._attr_native_unit_of_measurement = self.coordinator.data.currency_iso
+
+    def _handle_forecast(self, forecast: ForecastModel):
+        self._attr_native_value = forecast.lowest_balance
+        self._attr_extra_state_attributes["date"] = forecast.lowest_balance_date
+
+class LowestProjectedBalanceDateSensor(ForecastSensor):
+    _attr_device_class = SensorDeviceClass.DATE
+
+    def __init__(self, coordinator: YnabDataCoordinator, budget_id: str, device_info: DeviceInfo):
+        super().__init__(
+            coordinator, "lowest_projected_balance_date", "Lowest projected balance date", budget_id, device_info
+        )
+
+    def _handle_forecast(self, forecast: ForecastModel):
+        self._attr_native_value = date.fromisoformat(forecast.lowest_balance_date)
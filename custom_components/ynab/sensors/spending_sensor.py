@@ -0,0 +1,51 @@
+import logging
+
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor.const import SensorDeviceClass
+from homeassistant.components.sensor.const import STATE_CLASS_TOTAL
+from homeassistant.helpers.entity import DeviceInfo
+
+from custom_components.ynab.api.data_coordinator import (
+    SPENDING_CONTEXT,
+    YnabDataCoordinator,
+    DataCoordinatorModel,
+    from_milliunits,
+)
+from custom_components.ynab.const import ICON
+from custom_components.ynab.sensors.entity import YnabEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+class SpendingSensor(YnabEntity, SensorEntity):
+    """Outflows of the budget over a window, with the largest payees, categories and accounts."""
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = STATE_CLASS_TOTAL
+    _attr_has_entity_name = True
+    _attr_icon = ICON
+    # the breakdowns change with every transaction, keep them out of the history
+    _unrecorded_attributes = frozenset({"by_payee", "by_category", "by_account"})
+
+    def __init__(self, coordinator: YnabDataCoordinator, window: str, budget_id: str, device_info: DeviceInfo):
+        super().__init__(coordinator, (SPENDING_CONTEXT, window))
+
+        self._window = window
+        self._attr_extra_state_attributes = {}
+        self._attr_unique_id = f"budget_{budget_id}_spending_{window}"
+        self._attr_name = "Spending this month" if window == "month" else f"Spending last {window.removesuffix('d')} days"
+        self._attr_device_info = device_info
+        self._attr_native_unit_of_measurement = self.coordinator.data.currency_iso
+        self._handle_data(coordinator.data)
+
+    def _handle_data(self, data: DataCoordinatorModel):
+        spending = data.spending[self._window]
+
+        _LOGGER.debug("Received data for spending %s %s", self._window, spending)
+        self._attr_native_value = spending.total
+        for name, breakdown in (
+            ("by_payee", spending.by_payee),
+            ("by_category", spending.by_category),
+            ("by_account", spending.by_account),
+        ):
+            self._attr_extra_state_attributes[name] = {
+                key: float(from_milliunits(milliunits)) for key, milliunits in breakdown.items()
+            }
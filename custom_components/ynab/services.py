@@ -0,0 +1,35 @@
+"""Services for ynab."""
+import asyncio
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import ATTR_CONFIG_ENTRY_ID, DOMAIN, DOMAIN_DATA, SERVICE_REFRESH
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+})
+
+@callback
+def async_setup_services(hass):
+    """Register the services of the integration."""
+
+    async def refresh(call: ServiceCall):
+        """Refresh the given budgets, or all of them, merged with refreshes already requested."""
+        coordinators = hass.data.get(DOMAIN_DATA, {}).get("coordinators", {})
+        entry_ids = call.data.get(ATTR_CONFIG_ENTRY_ID, list(coordinators))
+
+        unknown = [entry_id for entry_id in entry_ids if entry_id not in coordinators]
+        if unknown:
+            raise ServiceValidationError(f"No loaded YNAB budget for config entry {', '.join(unknown)}")
+
+        _LOGGER.debug("Refresh of %s requested", entry_ids)
+        await asyncio.gather(*(coordinators[entry_id].async_request_refresh() for entry_id in entry_ids))
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, refresh, schema=REFRESH_SCHEMA)
@@ -0,0 +1,54 @@
+import json
+
+from custom_components.ynab.api.data_coordinator import YnabDataCoordinator
+from custom_components.ynab.api.instrumentation import RefreshRecord, StreamStats
+from custom_components.ynab.api.streaming import decode_items
+from custom_components.ynab.const import DECODE_IN_MEMORY_LIMIT
+from homeassistant.util import dt as dt_util
+
+class ByteReader:
+    """Async file-like object over bytes, returning at most `chunk_size` bytes a read."""
+
+    def __init__(self, data: bytes, chunk_size: int = 65536):
+        self._data = memoryview(data)
+        self._chunk_size = chunk_size
+
+    async def read(self, size: int = -1) -> bytes:
+        size = self._chunk_size if size < 0 else min(size, self._chunk_size)
+        chunk, self._data = self._data[:size], self._data[size:]
+        return bytes(chunk)
+
+class StubClient:
+    """Answers requests by path, with documents or errors queued in `responses`."""
+
+    def __init__(self, responses: dict[str, list]):
+        self.responses = responses
+        self.requests: list[tuple[str, dict | None]] = []
+
+    async def stream(self, method, path, handlers, params=None) -> StreamStats:
+        self.requests.append((path, params))
+        response = self.responses[path].pop(0)
+        if isinstance(response, Exception):
+            raise response
+        await decode_items(ByteReader(json.dumps(response).encode()), handlers, DECODE_IN_MEMORY_LIMIT)
+        return StreamStats()
+
+def make_coordinator(client: StubClient, snapshot, **config) -> YnabDataCoordinator:
+    """Return a coordinator that can sync `snapshot` without Home Assistant running."""
+    coordinator = YnabDataCoordinator.__new__(YnabDataCoordinator)
+    coordinator.budget = "budget"
+    coordinator.client = client
+    coordinator.snapshot = snapshot
+    coordinator.categories_all = False
+    coordinator.categories = []
+    coordinator.accounts_all = False
+    coordinator.accounts = []
+    coordinator.forecast_days = 0
+    coordinator.account_transactions = False
+    coordinator.missing_accounts = set()
+    for name, value in config.items():
+        setattr(coordinator, name, value)
+    return coordinator
+
+def new_record() -> RefreshRecord:
+    return RefreshRecord(dt_util.utcnow())
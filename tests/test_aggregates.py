@@ -0,0 +1,88 @@
+import pytest
+
+from custom_components.ynab.api.aggregates import TransactionAggregates, TransactionCounts, is_open
+from custom_components.ynab.api.budget_snapshot import BudgetSnapshot
+
+def transaction(transaction_id, approved=True, cleared="cleared", account="checking", **extra):
+    return {
+        "id": transaction_id,
+        "date": "2024-01-01",
+        "amount": 1_000,
+        "approved": approved,
+        "cleared": cleared,
+        "account_id": account,
+        **extra,
+    }
+
+@pytest.mark.parametrize(
+    ("flags", "expected"),
+    [
+        ((True, "cleared", "a"), False),
+        ((True, "reconciled", "a"), False),
+        ((False, "cleared", "a"), True),
+        ((True, "uncleared", "a"), True),
+        ((None, "cleared", "a"), True),
+    ],
+)
+def test_is_open(flags, expected):
+    assert is_open(flags) == expected
+
+def test_update_moves_counts_between_accounts():
+    aggregates = TransactionAggregates()
+    aggregates.update(None, (False, "uncleared", "checking"))
+    aggregates.update(None, (True, "uncleared", "savings"))
+    assert aggregates.totals == TransactionCounts(need_approval=1, uncleared=2)
+
+    aggregates.update((False, "uncleared", "checking"), (True, "uncleared", "savings"))
+    assert aggregates.for_account("checking") == TransactionCounts()
+    assert aggregates.for_account("savings") == TransactionCounts(uncleared=2)
+
+    aggregates.update((True, "uncleared", "savings"), None)
+    assert aggregates.totals == TransactionCounts(uncleared=1)
+
+def test_for_unknown_account():
+    assert TransactionAggregates().for_account("nope") == TransactionCounts()
+
+def test_verify_corrects_drift():
+    transactions = {"a": (False, "uncleared", "checking"), "b": (True, "uncleared", "checking")}
+    aggregates = TransactionAggregates.count(transactions)
+    assert aggregates.verify(transactions)
+
+    aggregates.update(None, (False, "cleared", "savings"))
+    assert not aggregates.verify(transactions)
+    assert aggregates.totals == TransactionCounts(need_approval=1, uncleared=2)
+    assert aggregates.verify(transactions)
+
+def test_snapshot_keeps_only_open_transactions():
+    snapshot = BudgetSnapshot()
+    snapshot.merge_transaction(transaction("a", approved=False))
+    snapshot.merge_transaction(transaction("b"))
+    assert set(snapshot.transactions) == {"a"}
+
+    # approved and cleared: no longer counted anywhere
+    snapshot.merge_transaction(transaction("a"))
+    assert snapshot.transactions == {}
+    assert snapshot.aggregates.totals == TransactionCounts()
+
+    snapshot.merge_transaction(transaction("b", cleared="uncleared"))
+    snapshot.merge_transaction(transaction("c", approved=False, deleted=True))
+    assert snapshot.aggregates.totals == TransactionCounts(uncleared=1)
+    assert snapshot.aggregates.verify(snapshot.transactions)
+
+def test_snapshot_open_dates_follow_the_open_transactions():
+    snapshot = BudgetSnapshot(tracked_accounts=["checking"])
+    snapshot.merge_account_transaction(transaction("a", cleared="uncleared"))
+    assert snapshot.open_dates == {"a": "2024-01-01"}
+
+    snapshot.merge_account_transaction(transaction("a"))
+    assert snapshot.open_dates == {}
+
+def test_snapshot_restore_drops_closed_transactions():
+    data = BudgetSnapshot().as_dict()
+    data["transactions"] = {"a": [True, "cleared", "checking"], "b": [False, "cleared", "checking"]}
+
+    snapshot = BudgetSnapshot()
+    snapshot.restore(data)
+
+    assert snapshot.transactions == {"b": (False, "cleared", "checking")}
+    assert snapshot.aggregates.totals == TransactionCounts(need_approval=1)
@@ -0,0 +1,42 @@
+from datetime import date
+
+import pytest
+
+from custom_components.ynab.api.budget_snapshot import BudgetSnapshot
+
+TODAY = date(2024, 3, 20)
+
+def open_transaction(transaction_id, day, account="checking"):
+    return {
+        "id": transaction_id,
+        "date": day,
+        "amount": -1_000,
+        "approved": False,
+        "cleared": "uncleared",
+        "account_id": account,
+    }
+
+@pytest.mark.parametrize(
+    ("windows", "expected"),
+    [
+        # backdated imports are still caught without any spending windows
+        ([], "2024-02-19"),
+        (["month"], "2024-02-19"),
+        (["7d"], "2024-02-19"),
+        (["90d"], "2023-12-22"),
+    ],
+)
+def test_watermark_looks_back_at_least_the_lookback(windows, expected):
+    snapshot = BudgetSnapshot(windows, tracked_accounts=["checking"])
+    snapshot.spending.advance(TODAY)
+
+    assert snapshot.watermark("checking", TODAY) == expected
+
+def test_watermark_follows_the_oldest_open_transaction_of_the_account():
+    snapshot = BudgetSnapshot(["month"], tracked_accounts=["checking", "savings"])
+    snapshot.spending.advance(TODAY)
+    snapshot.merge_account_transaction(open_transaction("a", "2023-11-02"))
+    snapshot.merge_account_transaction(open_transaction("b", "2023-10-01", account="savings"))
+
+    assert snapshot.watermark("checking", TODAY) == "2023-11-02"
+    assert snapshot.watermark("savings", TODAY) == "2023-10-01"
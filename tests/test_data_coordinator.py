@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from custom_components.ynab.api.budget_snapshot import BudgetSnapshot, account_key
+from custom_components.ynab.api.client import YnabApiError, YnabAuthError
+from custom_components.ynab.api.data_coordinator import knowledge_rejected
+from custom_components.ynab.api.planner import Endpoint
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .common import StubClient, make_coordinator, new_record
+
+MONTH = "/budgets/budget/months/current"
+ACCOUNTS = "/budgets/budget/accounts"
+TRANSACTIONS = "/budgets/budget/transactions"
+
+def account_path(account_id):
+    return f"/budgets/budget/accounts/{account_id}/transactions"
+
+def knowledge(server_knowledge, **data):
+    return {"data": {**data, "server_knowledge": server_knowledge}}
+
+def test_deleted_tracked_account_is_no_longer_requested():
+    snapshot = BudgetSnapshot(tracked_accounts=["checking", "gone"])
+    snapshot.currency_iso = "USD"
+    client = StubClient(
+        {
+            MONTH: [{"data": {}}, {"data": {}}],
+            ACCOUNTS: [knowledge(1, accounts=[]), knowledge(1, accounts=[])],
+            account_path("checking"): [knowledge(1, transactions=[]), knowledge(1, transactions=[])],
+            account_path("gone"): [YnabApiError("not found", 404)],
+        }
+    )
+    coordinator = make_coordinator(client, snapshot, accounts=["checking", "gone"], account_transactions=True)
+
+    asyncio.run(coordinator.sync_budget(new_record()))
+    assert coordinator.missing_accounts == {"gone"}
+    assert account_key("gone") not in snapshot.knowledge
+
+    client.requests.clear()
+    asyncio.run(coordinator.sync_budget(new_record()))
+    assert account_path("gone") not in [path for path, _ in client.requests]
+    assert account_path("checking") in [path for path, _ in client.requests]
+
+def open_transaction(transaction_id):
+    return {
+        "id": transaction_id,
+        "date": "2024-01-01",
+        "amount": -1_000,
+        "approved": False,
+        "cleared": "uncleared",
+        "account_id": "checking",
+    }
+
+class DeltaSync:
+    """The budget transactions of a snapshot at `stored_knowledge`, holding the open transaction "old"."""
+
+    def __init__(self, responses: list, stored_knowledge: int | None = 10):
+        self.snapshot = BudgetSnapshot()
+        self.snapshot.merge_transaction(open_transaction("old"))
+        if stored_knowledge is not None:
+            self.snapshot.knowledge[Endpoint.TRANSACTIONS] = stored_knowledge
+        self.client = StubClient({TRANSACTIONS: responses})
+        self.resets = 0
+
+    def reset(self):
+        self.resets += 1
+        self.snapshot.reset(Endpoint.TRANSACTIONS)
+
+    def run(self, params: dict | None = None) -> "DeltaSync":
+        coordinator = make_coordinator(self.client, self.snapshot)
+        asyncio.run(
+            coordinator.sync_delta(
+                Endpoint.TRANSACTIONS,
+                TRANSACTIONS,
+                Endpoint.TRANSACTIONS,
+                self.snapshot.handlers(Endpoint.TRANSACTIONS),
+                self.reset,
+                new_record(),
+                params,
+            )
+        )
+        return self
+
+@pytest.mark.parametrize(
+    ("error", "rejected"),
+    [
+        (YnabApiError("bad request", 400), True),
+        (YnabApiError("conflict", 409), True),
+        (YnabAuthError("unauthorized", 401), False),
+        (YnabApiError("forbidden", 403), False),
+        (YnabApiError("not found", 404), False),
+        (YnabApiError("too many requests", 429), False),
+        (YnabApiError("unavailable", 503), False),
+        (YnabApiError("timeout"), False),
+    ],
+)
+def test_knowledge_rejected(error, rejected):
+    assert knowledge_rejected(error) == rejected
+
+def test_delta_is_merged():
+    sync = DeltaSync([knowledge(11, transactions=[open_transaction("new")])]).run()
+
+    assert sync.client.requests == [(TRANSACTIONS, {"last_knowledge_of_server": 10})]
+    assert sync.resets == 0
+    assert set(sync.snapshot.transactions) == {"old", "new"}
+    assert sync.snapshot.knowledge[Endpoint.TRANSACTIONS] == 11
+
+def test_rejected_knowledge_resets_and_refetches_without_since_date():
+    sync = DeltaSync([YnabApiError("bad request", 400), knowledge(20, transactions=[open_transaction("new")])])
+    sync.run({"since_date": "2024-01-01"})
+
+    assert sync.client.requests == [
+        (TRANSACTIONS, {"since_date": "2024-01-01", "last_knowledge_of_server": 10}),
+        (TRANSACTIONS, None),
+    ]
+    assert sync.resets == 1
+    assert set(sync.snapshot.transactions) == {"new"}
+    assert sync.snapshot.knowledge[Endpoint.TRANSACTIONS] == 20
+
+@pytest.mark.parametrize("status", [500, 503, 404, 429, 401])
+def test_errors_not_about_the_knowledge_raise_without_resetting(status):
+    sync = DeltaSync([YnabApiError("error", status)])
+
+    with pytest.raises(YnabApiError):
+        sync.run({"since_date": "2024-01-01"})
+
+    assert len(sync.client.requests) == 1
+    assert sync.resets == 0
+    assert set(sync.snapshot.transactions) == {"old"}
+    assert sync.snapshot.knowledge[Endpoint.TRANSACTIONS] == 10
+
+def test_response_without_knowledge_resets():
+    sync = DeltaSync([{"data": {"transactions": []}}, knowledge(20, transactions=[open_transaction("new")])]).run()
+
+    assert sync.client.requests[1] == (TRANSACTIONS, None)
+    assert sync.resets == 1
+    assert set(sync.snapshot.transactions) == {"new"}
+
+def test_older_knowledge_than_stored_resets():
+    sync = DeltaSync([knowledge(5, transactions=[]), knowledge(20, transactions=[])]).run()
+
+    assert len(sync.client.requests) == 2
+    assert sync.resets == 1
+    assert sync.snapshot.transactions == {}
+    assert sync.snapshot.knowledge[Endpoint.TRANSACTIONS] == 20
+
+def test_full_fetch_without_knowledge_fails_the_refresh():
+    with pytest.raises(UpdateFailed):
+        DeltaSync([{"data": {"transactions": []}}], stored_knowledge=None).run()
@@ -0,0 +1,146 @@
+from datetime import date
+
+import pytest
+
+from custom_components.ynab.api.forecast import ScheduleForecast, add_months, occurrences, scheduled_effects
+
+def days(date_first, date_next, frequency, until):
+    return [day.isoformat() for day in occurrences(date_first, date_next, frequency, date.fromisoformat(until))]
+
+def scheduled(scheduled_id, account_id, amount, frequency="monthly", date_first="2024-01-15", date_next="2024-01-15", **extra):
+    return {
+        "id": scheduled_id,
+        "account_id": account_id,
+        "amount": amount,
+        "frequency": frequency,
+        "date_first": date_first,
+        "date_next": date_next,
+        **extra,
+    }
+
+@pytest.mark.parametrize(
+    ("day", "months", "day_of_month", "expected"),
+    [
+        (date(2024, 1, 31), 1, 31, date(2024, 2, 29)),
+        (date(2023, 1, 31), 1, 31, date(2023, 2, 28)),
+        (date(2024, 1, 31), 2, 31, date(2024, 3, 31)),
+        (date(2024, 11, 15), 3, 15, date(2025, 2, 15)),
+        (date(2024, 3, 31), -1, 31, date(2024, 2, 29)),
+    ],
+)
+def test_add_months(day, months, day_of_month, expected):
+    assert add_months(day, months, day_of_month) == expected
+
+def test_fixed_length_frequencies():
+    assert days("2024-01-01", "2024-01-01", "weekly", "2024-01-22") == [
+        "2024-01-01",
+        "2024-01-08",
+        "2024-01-15",
+        "2024-01-22",
+    ]
+    assert days("2024-01-01", "2024-01-10", "everyOtherWeek", "2024-02-10") == ["2024-01-10", "2024-01-24", "2024-02-07"]
+
+def test_monthly_clamps_to_the_end_of_shorter_months():
+    assert days("2024-01-31", "2024-01-31", "monthly", "2024-05-31") == [
+        "2024-01-31",
+        "2024-02-29",
+        "2024-03-31",
+        "2024-04-30",
+        "2024-05-31",
+    ]
+
+def test_monthly_returns_to_the_first_day_of_month_after_a_short_month():
+    # the next occurrence was clamped to February 29, the first one was on the 31st
+    assert days("2024-01-31", "2024-02-29", "monthly", "2024-04-30") == ["2024-02-29", "2024-03-31", "2024-04-30"]
+
+def test_yearly_on_a_leap_day():
+    assert days("2024-02-29", "2024-02-29", "yearly", "2028-03-01") == [
+        "2024-02-29",
+        "2025-02-28",
+        "2026-02-28",
+        "2027-02-28",
+        "2028-02-29",
+    ]
+
+def test_twice_a_month():
+    assert days("2024-01-01", "2024-01-16", "twiceAMonth", "2024-03-01") == [
+        "2024-01-16",
+        "2024-02-01",
+        "2024-02-16",
+        "2024-03-01",
+    ]
+
+def test_twice_a_month_clamps_to_the_end_of_the_month():
+    # the 15th and the 30th, which February does not have
+    assert days("2024-01-15", "2024-01-15", "twiceAMonth", "2024-03-15") == [
+        "2024-01-15",
+        "2024-01-30",
+        "2024-02-15",
+        "2024-02-29",
+        "2024-03-15",
+    ]
+
+def test_never_and_past_the_horizon():
+    assert days("2024-01-10", "2024-01-10", "never", "2024-12-31") == ["2024-01-10"]
+    assert days("2024-01-10", "2024-01-10", "never", "2024-01-09") == []
+    assert days("2024-01-10", "2024-02-10", "monthly", "2024-01-31") == []
+
+def test_scheduled_effects_of_transfers():
+    assert scheduled_effects(scheduled("s", "checking", -1000, transfer_account_id="savings")) == (
+        ("checking", -1000),
+        ("savings", 1000),
+    )
+    split = scheduled(
+        "s",
+        "checking",
+        -3000,
+        subtransactions=[
+            {"amount": -1000, "transfer_account_id": "savings"},
+            {"amount": -2000, "transfer_account_id": None},
+            {"amount": -500, "transfer_account_id": "savings", "deleted": True},
+        ],
+    )
+    assert scheduled_effects(split) == (("checking", -3000), ("savings", 1000))
+
+def test_projection():
+    forecast = ScheduleForecast(30)
+    forecast.update(scheduled("rent", "checking", -100_000, date_first="2024-01-10", date_next="2024-01-10"))
+    forecast.update(scheduled("pay", "checking", 150_000, "everyOtherWeek", "2024-01-05", "2024-01-19"))
+
+    projections = forecast.project({"checking": 50_000, "cash": 7_000}, date(2024, 1, 1))
+
+    # rent on the 10th, pay on the 19th
+    assert projections["checking"] == (100_000, -50_000, "2024-01-10")
+    assert projections["cash"] == (7_000, 7_000, "2024-01-01")
+    assert forecast.project_total({"checking": 50_000, "cash": 7_000}, date(2024, 1, 1)) == (
+        107_000,
+        -43_000,
+        "2024-01-10",
+    )
+
+def test_overdue_occurrences_count_today():
+    forecast = ScheduleForecast(3)
+    forecast.update(scheduled("late", "checking", -1_000, "weekly", "2023-12-01", "2023-12-29"))
+
+    assert forecast.project({"checking": 0}, date(2024, 1, 1))["checking"] == (-1_000, -1_000, "2024-01-01")
+
+def test_changes_and_deletions_expand_again():
+    forecast = ScheduleForecast(30)
+    forecast.update(scheduled("rent", "checking", -100_000, date_first="2024-01-10", date_next="2024-01-10"))
+    assert forecast.project({"checking": 0}, date(2024, 1, 1))["checking"][0] == -100_000
+
+    forecast.update(scheduled("rent", "checking", -120_000, date_first="2024-01-10", date_next="2024-01-10"))
+    assert forecast.project({"checking": 0}, date(2024, 1, 1))["checking"][0] == -120_000
+
+    forecast.update({"id": "rent", "deleted": True})
+    assert forecast.project({"checking": 0}, date(2024, 1, 1))["checking"] == (0, 0, "2024-01-01")
+
+def test_restore():
+    forecast = ScheduleForecast(30)
+    forecast.update(scheduled("pay", "checking", 150_000, "everyOtherWeek", "2024-01-05", "2024-01-05"))
+
+    restored = ScheduleForecast(30)
+    restored.restore(forecast.as_dict())
+
+    assert restored.scheduled == forecast.scheduled
+    assert restored.project({"checking": 0}, date(2024, 1, 1)) == forecast.project({"checking": 0}, date(2024, 1, 1))
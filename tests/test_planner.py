@@ -0,0 +1,31 @@
+from custom_components.ynab.api.planner import Endpoint, plan_endpoints
+
+def test_budget_sensors_only():
+    assert plan_endpoints(categories=False, accounts=False, currency_known=True) == sorted(
+        [Endpoint.MONTH_CURRENT, Endpoint.ACCOUNTS, Endpoint.TRANSACTIONS]
+    )
+
+def test_settings_while_the_currency_is_unknown():
+    assert Endpoint.SETTINGS in plan_endpoints(categories=False, accounts=False, currency_known=False)
+    assert Endpoint.SETTINGS not in plan_endpoints(categories=False, accounts=False, currency_known=True)
+
+def test_category_sensors_need_the_months():
+    assert Endpoint.MONTHS in plan_endpoints(categories=True, accounts=False, currency_known=True)
+    assert Endpoint.MONTHS not in plan_endpoints(categories=False, accounts=True, currency_known=True)
+
+def test_forecast_needs_the_scheduled_transactions():
+    assert Endpoint.SCHEDULED_TRANSACTIONS in plan_endpoints(False, False, True, forecast=True)
+    assert Endpoint.SCHEDULED_TRANSACTIONS not in plan_endpoints(False, False, True)
+
+def test_account_transactions_replace_the_budget_transactions():
+    endpoints = plan_endpoints(categories=False, accounts=True, currency_known=True, account_transactions=True)
+
+    assert Endpoint.ACCOUNT_TRANSACTIONS in endpoints
+    assert Endpoint.TRANSACTIONS not in endpoints
+
+def test_every_endpoint_once_in_a_stable_order():
+    endpoints = plan_endpoints(True, True, False, forecast=True)
+
+    assert len(endpoints) == len(set(endpoints))
+    assert endpoints == sorted(endpoints)
+    assert set(endpoints) == set(Endpoint) - {Endpoint.MONTH, Endpoint.ACCOUNT_TRANSACTIONS}
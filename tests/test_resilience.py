@@ -0,0 +1,93 @@
+import pytest
+
+from custom_components.ynab.api import resilience
+from custom_components.ynab.api.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, jittered
+from custom_components.ynab.const import BACKOFF_BASE, BACKOFF_MAX, CIRCUIT_FAILURE_THRESHOLD
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock)
+    # the longest delay, so the retries are predictable
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    return clock
+
+def test_jittered_stays_within_half_and_all():
+    for _ in range(100):
+        assert BACKOFF_BASE / 2 <= jittered(BACKOFF_BASE) <= BACKOFF_BASE
+
+def test_stays_closed_below_the_threshold(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+def test_opens_at_the_threshold_then_half_opens(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        delay = breaker.record_failure()
+
+    assert delay == BACKOFF_BASE * 2 ** (CIRCUIT_FAILURE_THRESHOLD - 1)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.retry_in() == delay
+
+    clock.now += delay
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+def test_half_open_trial(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+        breaker.record_failure()
+    breaker.half_open()
+    assert breaker.state == HALF_OPEN
+    assert breaker.retry_in() is None
+
+    # a failed trial opens the circuit for longer
+    assert breaker.record_failure() == BACKOFF_BASE * 2**CIRCUIT_FAILURE_THRESHOLD
+    assert breaker.state == OPEN
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert breaker.retry_in() is None
+
+def test_backoff_is_capped(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(20):
+        delay = breaker.record_failure()
+
+    assert delay == BACKOFF_MAX
+
+def test_throttled_opens_right_away(clock):
+    breaker = CircuitBreaker("test")
+
+    delay = breaker.record_throttled(3600)
+
+    assert delay == 3600 + BACKOFF_BASE
+    assert breaker.state == OPEN
+    assert breaker.failures == CIRCUIT_FAILURE_THRESHOLD
+
+    clock.now += delay
+    assert breaker.state == HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_throttled_keeps_counting_failures(clock):
+    breaker = CircuitBreaker("test")
+    for _ in range(CIRCUIT_FAILURE_THRESHOLD + 1):
+        breaker.record_failure()
+
+    breaker.record_throttled(60)
+
+    assert breaker.failures == CIRCUIT_FAILURE_THRESHOLD + 2
@@ -0,0 +1,136 @@
+from datetime import date
+
+import pytest
+
+from custom_components.ynab.api.spending import SpendingIndex, spend_entries, window_days
+
+def transaction(day, amount, payee="shop", category="food", account="checking", **extra):
+    return {
+        "date": day,
+        "amount": amount,
+        "payee_id": payee,
+        "payee_name": payee.title(),
+        "category_id": category,
+        "category_name": category.title(),
+        "account_id": account,
+        "account_name": account.title(),
+        **extra,
+    }
+
+def total(index, window=0):
+    return index.summary(index.windows[window], 10)[0]
+
+@pytest.mark.parametrize(("name", "days"), [("7d", 7), ("30d", 30), ("month", None)])
+def test_window_days(name, days):
+    assert window_days(name) == days
+
+@pytest.mark.parametrize("name", ["0d", "d", "-5d", "30", "week", ""])
+def test_window_days_rejects_unknown_windows(name):
+    with pytest.raises(ValueError):
+        window_days(name)
+
+def test_spend_entries_skip_inflows_and_transfers():
+    assert spend_entries(transaction("2024-01-01", 5_000))[0] == []
+    assert spend_entries(transaction("2024-01-01", -5_000, transfer_account_id="savings"))[0] == []
+
+    split = transaction(
+        "2024-01-01",
+        -3_000,
+        subtransactions=[
+            {"amount": -1_000, "category_id": "food"},
+            {"amount": -2_000, "category_id": "fun", "category_name": "Fun"},
+            {"amount": -500, "category_id": "food", "deleted": True},
+        ],
+    )
+    entries, names = spend_entries(split)
+    assert entries == [
+        ("2024-01-01", 1_000, "shop", "food", "checking"),
+        ("2024-01-01", 2_000, "shop", "fun", "checking"),
+    ]
+    assert names[("category", "fun")] == "Fun"
+
+def test_update_adds_changes_and_removes():
+    index = SpendingIndex(["7d"])
+    index.advance(date(2024, 1, 10))
+
+    index.update("a", transaction("2024-01-09", -1_000))
+    index.update("b", transaction("2024-01-10", -2_000, payee="cafe"))
+    assert total(index) == 3_000
+
+    index.update("a", transaction("2024-01-09", -1_500))
+    assert total(index) == 3_500
+
+    index.update("b", None)
+    assert total(index) == 1_500
+    assert index.summary(index.windows[0], 10)[1]["payee"] == {"Shop": 1_500}
+
+def test_update_outside_the_window_is_not_counted():
+    index = SpendingIndex(["7d"])
+    index.advance(date(2024, 1, 10))
+
+    index.update("old", transaction("2024-01-01", -1_000))
+    index.update("future", transaction("2024-01-11", -1_000))
+
+    assert total(index) == 0
+
+def test_advance_moves_the_window():
+    index = SpendingIndex(["7d"])
+    index.advance(date(2024, 1, 7))
+    index.update("a", transaction("2024-01-01", -1_000))
+    index.update("b", transaction("2024-01-05", -2_000))
+    index.update("c", transaction("2024-01-08", -4_000))
+    assert total(index) == 3_000
+
+    # 01-02 to 01-08: the first day left, the last came in
+    index.advance(date(2024, 1, 8))
+    assert total(index) == 6_000
+
+    # no overlap with the old window
+    index.advance(date(2024, 2, 1))
+    assert total(index) == 0
+
+def test_advance_matches_a_fresh_index():
+    transactions = {f"t{day}": transaction(f"2024-01-{day:02}", -day * 100) for day in range(1, 32)}
+    index = SpendingIndex(["7d", "month"])
+    index.advance(date(2024, 1, 1))
+    for transaction_id, data in transactions.items():
+        index.update(transaction_id, data)
+
+    for day in range(2, 32):
+        today = date(2024, 1, day)
+        index.advance(today)
+        fresh = SpendingIndex(["7d", "month"])
+        fresh.advance(today)
+        for transaction_id, data in transactions.items():
+            fresh.update(transaction_id, data)
+        assert [window.amounts for window in index.windows] == [window.amounts for window in fresh.windows]
+
+def test_month_to_date():
+    index = SpendingIndex(["month"])
+    index.advance(date(2024, 2, 10))
+    index.update("january", transaction("2024-01-31", -1_000))
+    index.update("february", transaction("2024-02-01", -2_000))
+
+    assert total(index) == 2_000
+
+def test_advance_prunes_days_before_the_windows():
+    index = SpendingIndex(["7d"])
+    index.advance(date(2024, 1, 7))
+    index.update("a", transaction("2024-01-01", -1_000))
+
+    index.advance(date(2024, 1, 20))
+
+    assert index.as_dict()["records"] == {}
+
+def test_restore():
+    index = SpendingIndex(["7d"])
+    index.advance(date(2024, 1, 10))
+    index.update("a", transaction("2024-01-09", -1_000))
+
+    restored = SpendingIndex(["7d"])
+    assert restored.restore(index.as_dict())
+    restored.advance(date(2024, 1, 10))
+    assert total(restored) == 1_000
+
+    # a longer window needs days that were not kept
+    assert not SpendingIndex(["30d"]).restore(index.as_dict())
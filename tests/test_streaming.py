@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from custom_components.ynab.api.streaming import PrefixedReader, decode_items, dispatch_items, values_at
+
+from .common import ByteReader
+
+def document(count: int) -> dict:
+    return {
+        "data": {
+            "transactions": [
+                {
+                    "id": f"t{index}",
+                    "amount": -index * 10,
+                    "memo": "café \"quoted\"" if index % 3 else None,
+                    "approved": index % 2 == 0,
+                    "subtransactions": [{"id": f"s{index}", "amount": -5.5}] if index % 7 == 0 else [],
+                }
+                for index in range(count)
+            ],
+            "server_knowledge": 42,
+        }
+    }
+
+def collect(handlers_for, run) -> dict[str, list]:
+    """Run `run` with recording handlers for the prefixes and return what each received."""
+    received = {prefix: [] for prefix in handlers_for}
+    asyncio.run(run({prefix: received[prefix].append for prefix in handlers_for}))
+    return received
+
+PREFIXES = ("data.transactions.item", "data.server_knowledge", "data.missing")
+
+def test_dispatch_items_hands_each_value_to_its_handler():
+    doc = document(50)
+    data = json.dumps(doc).encode()
+
+    received = collect(PREFIXES, lambda handlers: dispatch_items(ByteReader(data, 7), handlers))
+
+    assert received["data.transactions.item"] == doc["data"]["transactions"]
+    assert received["data.server_knowledge"] == [42]
+    assert received["data.missing"] == []
+
+def test_dispatch_items_nested_values_and_empty_arrays():
+    data = json.dumps({"data": {"month": {"categories": [], "note": {"a": [1, {"b": []}]}}}}).encode()
+
+    received = collect(
+        ("data.month", "data.month.categories.item"),
+        lambda handlers: dispatch_items(ByteReader(data, 3), handlers),
+    )
+
+    assert received["data.month"] == [{"categories": [], "note": {"a": [1, {"b": []}]}}]
+    assert received["data.month.categories.item"] == []
+
+@pytest.mark.parametrize("chunk_size", [997, 65536])
+@pytest.mark.parametrize("limit", [0, 4500, 10**9])
+def test_decode_items_agrees_below_and_above_the_limit(limit, chunk_size):
+    doc = document(2000)
+    data = json.dumps(doc).encode()
+
+    # in memory with a limit above the size, parsed incrementally from the buffered prefix below it
+    received = collect(PREFIXES, lambda handlers: decode_items(ByteReader(data, chunk_size), handlers, limit))
+    expected = collect(PREFIXES, lambda handlers: dispatch_items(ByteReader(data), handlers))
+
+    assert received == expected
+    assert received["data.transactions.item"] == doc["data"]["transactions"]
+
+@pytest.mark.parametrize("offset", [-1, 0, 1])
+def test_decode_items_at_the_limit(offset):
+    data = json.dumps(document(20)).encode()
+
+    received = collect(
+        PREFIXES, lambda handlers: decode_items(ByteReader(data, 100), handlers, len(data) + offset)
+    )
+
+    assert received["data.transactions.item"] == document(20)["data"]["transactions"]
+    assert received["data.server_knowledge"] == [42]
+
+def test_prefixed_reader_replays_the_prefix_then_the_source():
+    async def read_all(reader, size):
+        chunks = []
+        while chunk := await reader.read(size):
+            chunks.append(chunk)
+        return chunks
+
+    reader = PrefixedReader(bytearray(b"abcdef"), ByteReader(b"ghij"))
+    assert asyncio.run(reader.read(0)) == b""
+    assert asyncio.run(read_all(reader, 4)) == [b"abcd", b"ef", b"ghij"]
+
+def test_values_at():
+    doc = {"data": {"items": [{"id": 1}, {"id": 2}], "knowledge": 3, "other": "x"}}
+
+    assert list(values_at(doc, ["data", "items", "item"])) == [{"id": 1}, {"id": 2}]
+    assert list(values_at(doc, ["data", "items", "item", "id"])) == [1, 2]
+    assert list(values_at(doc, ["data", "knowledge"])) == [3]
+    assert list(values_at(doc, ["data", "missing"])) == []
+    assert list(values_at(doc, ["data", "other", "item"])) == []